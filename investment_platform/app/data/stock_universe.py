@@ -4,6 +4,7 @@ Stock Universe Data Definitions
 Contains metadata for all 50 stocks available for trading, organized by sector.
 Each stock includes symbol, name, sector, base price, and beta (volatility factor).
 """
+from functools import lru_cache
 
 # Stock Universe - 50 stocks across 8 sectors
 STOCK_UNIVERSE = {
@@ -126,11 +127,7 @@ def get_stocks_by_sector(sector: str) -> list:
     Returns:
         List of tuples (symbol, stock_info)
     """
-    return [
-        (symbol, info)
-        for symbol, info in STOCK_UNIVERSE.items()
-        if info['sector'] == sector
-    ]
+    return list(_sector_stocks(sector))
 
 
 def get_sector_symbols(sector: str) -> list:
@@ -143,11 +140,17 @@ def get_sector_symbols(sector: str) -> list:
     Returns:
         List of symbol strings
     """
-    return [
-        symbol
+    return [symbol for symbol, _ in _sector_stocks(sector)]
+
+
+@lru_cache(maxsize=None)
+def _sector_stocks(sector: str) -> tuple:
+    """Scan STOCK_UNIVERSE for a sector once; the universe never changes."""
+    return tuple(
+        (symbol, info)
         for symbol, info in STOCK_UNIVERSE.items()
         if info['sector'] == sector
-    ]
+    )
 
 
 def get_stock_beta(symbol: str) -> float:
@@ -5,7 +5,8 @@ Supports SQLite, DB2, and CSV file storage backends.
 Configure via STORAGE_BACKEND in config (sqlite, db2, csv).
 """
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
 
 # Create declarative base for models
@@ -120,6 +121,29 @@ def init_db(app=None, database_url=None):
                 'pool_recycle': 1800,
             })
 
+    # An in-memory SQLite database lives in its connection; share a single
+    # connection across threads so every session sees the same database
+    url = make_url(database_url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        engine_kwargs['poolclass'] = StaticPool
+        engine_kwargs['connect_args'] = {'check_same_thread': False}
+
+    # Rows per batched INSERT when SQLAlchemy's "insertmanyvalues" mode
+    # applies: executemany INSERTs with RETURNING (e.g. ORM bulk adds that
+    # fetch primary keys), plus plain executemany INSERTs on psycopg2.
+    # Plain executemany INSERTs on SQLite go through cursor.executemany()
+    # and ignore this. Override with DB_INSERT_PAGE_SIZE.
+    engine_kwargs['insertmanyvalues_page_size'] = int(
+        os.getenv('DB_INSERT_PAGE_SIZE', 1000)
+    )
+
+    # psycopg2: also batch executemany UPDATE/DELETE (e.g. cache refreshes)
+    # with execute_batch. INSERTs already use insertmanyvalues; psycopg 3
+    # is fast by default and takes no executemany options.
+    if url.get_backend_name() == 'postgresql' and url.get_driver_name() == 'psycopg2':
+        engine_kwargs['executemany_mode'] = 'values_plus_batch'
+        engine_kwargs['executemany_batch_page_size'] = 500
+
     _engine = create_engine(database_url, **engine_kwargs)
     _session_factory = sessionmaker(bind=_engine)
     _Session = scoped_session(_session_factory)
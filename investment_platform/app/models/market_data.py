@@ -5,7 +5,8 @@ Caches historical price data from Yahoo Finance to minimize API calls.
 """
 from datetime import datetime, date, timezone
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, BigInteger, UniqueConstraint, Index
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, BigInteger, UniqueConstraint, Index, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.database import Base, get_scoped_session, is_csv_backend, get_csv_storage
 
@@ -142,12 +143,32 @@ class MarketDataCache(Base):
             return
 
         session = get_scoped_session()
+
+        if not records:
+            return
+
+        # One timestamp for the whole batch
+        fetched_at = datetime.now(timezone.utc)
+
+        if session.get_bind().dialect.name == 'sqlite':
+            cls._upsert_sqlite(session, records, fetched_at)
+            return
+
+        # Prefetch existing rows for these symbols/dates in one query
+        symbols = {record['symbol'] for record in records}
+        dates = [record['date'] for record in records]
+        existing_rows = {
+            (row.symbol, row.date): row
+            for row in session.query(cls).filter(
+                cls.symbol.in_(symbols),
+                cls.date >= min(dates),
+                cls.date <= max(dates)
+            )
+        }
+
+        new_records = {}
         for record in records:
-            # Check if record exists
-            existing = session.query(cls).filter_by(
-                symbol=record['symbol'],
-                date=record['date']
-            ).first()
+            existing = existing_rows.get((record['symbol'], record['date']))
 
             if existing:
                 # Update existing record
@@ -157,21 +178,57 @@ class MarketDataCache(Base):
                 existing.close = record['close']
                 existing.adj_close = record['adj_close']
                 existing.volume = record.get('volume')
-                existing.fetched_at = datetime.now(timezone.utc)
+                existing.fetched_at = fetched_at
             else:
-                # Insert new record
-                new_record = cls(
-                    symbol=record['symbol'],
-                    date=record['date'],
-                    open=record.get('open'),
-                    high=record.get('high'),
-                    low=record.get('low'),
-                    close=record['close'],
-                    adj_close=record['adj_close'],
-                    volume=record.get('volume'),
-                    fetched_at=datetime.now(timezone.utc)
-                )
-                session.add(new_record)
+                # Queue new record (last one wins for duplicate dates)
+                new_records[(record['symbol'], record['date'])] = {
+                    'symbol': record['symbol'],
+                    'date': record['date'],
+                    'open': record.get('open'),
+                    'high': record.get('high'),
+                    'low': record.get('low'),
+                    'close': record['close'],
+                    'adj_close': record['adj_close'],
+                    'volume': record.get('volume'),
+                    'fetched_at': fetched_at
+                }
+
+        # Insert all new records in a single executemany INSERT
+        if new_records:
+            session.execute(insert(cls), list(new_records.values()))
+
+    @classmethod
+    def _upsert_sqlite(cls, session, records, fetched_at):
+        """
+        Upsert records with INSERT ... ON CONFLICT (symbol, date) DO UPDATE.
+
+        Relies on the uix_market_data_symbol_date constraint, so no existence
+        check query is needed.
+        """
+        rows = {}
+        for record in records:
+            # Last one wins for duplicate dates
+            rows[(record['symbol'], record['date'])] = {
+                'symbol': record['symbol'],
+                'date': record['date'],
+                'open': record.get('open'),
+                'high': record.get('high'),
+                'low': record.get('low'),
+                'close': record['close'],
+                'adj_close': record['adj_close'],
+                'volume': record.get('volume'),
+                'fetched_at': fetched_at
+            }
+
+        stmt = sqlite_insert(cls.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['symbol', 'date'],
+            set_={
+                column: stmt.excluded[column]
+                for column in ('open', 'high', 'low', 'close', 'adj_close', 'volume', 'fetched_at')
+            }
+        )
+        session.execute(stmt, list(rows.values()))
 
     @classmethod
     def delete_symbol_cache(cls, symbol):
@@ -4,7 +4,8 @@ Market Data Metadata Model
 Tracks cache status for each symbol to enable smart cache refresh.
 """
 from datetime import datetime, date, timezone
-from sqlalchemy import Column, Integer, String, DateTime, Date
+from sqlalchemy import Column, Integer, String, DateTime, Date, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.database import Base, get_scoped_session, is_csv_backend, get_csv_storage
 
@@ -182,6 +183,60 @@ class MarketDataMetadata(Base):
         self.last_updated = datetime.now(timezone.utc)
         self.fetch_status = self.STATUS_COMPLETE
 
+    @classmethod
+    def upsert_after_fetch(cls, symbol, earliest, latest, total_records):
+        """
+        Create or update a symbol's metadata after a fetch in one statement.
+
+        Same semantics as get_or_create() followed by update_after_fetch().
+        On SQLite this is a single INSERT ... ON CONFLICT DO UPDATE; other
+        backends fall back to the ORM path. The caller commits.
+
+        Args:
+            symbol: Stock ticker symbol
+            earliest: Earliest date in fetched data
+            latest: Latest date in fetched data
+            total_records: Total number of records now in cache
+        """
+        session = get_scoped_session()
+        if session.get_bind().dialect.name != 'sqlite':
+            metadata = session.query(cls).filter_by(symbol=symbol).first()
+            if not metadata:
+                metadata = cls(symbol=symbol)
+                session.add(metadata)
+            metadata.update_after_fetch(earliest, latest, total_records)
+            return
+
+        table = cls.__table__
+        stmt = sqlite_insert(table).values(
+            symbol=symbol,
+            earliest_date=earliest,
+            latest_date=latest,
+            total_records=total_records,
+            last_fetch_date=date.today(),
+            last_updated=datetime.now(timezone.utc),
+            fetch_status=cls.STATUS_COMPLETE
+        )
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['symbol'],
+            set_={
+                'earliest_date': func.min(
+                    func.coalesce(table.c.earliest_date, excluded.earliest_date),
+                    excluded.earliest_date
+                ),
+                'latest_date': func.max(
+                    func.coalesce(table.c.latest_date, excluded.latest_date),
+                    excluded.latest_date
+                ),
+                'total_records': excluded.total_records,
+                'last_fetch_date': excluded.last_fetch_date,
+                'last_updated': excluded.last_updated,
+                'fetch_status': excluded.fetch_status,
+            }
+        )
+        session.execute(stmt)
+
     @classmethod
     def delete_metadata(cls, symbol):
         """Delete metadata for a symbol."""
@@ -87,15 +87,17 @@ class UserStrategyStock(Base):
         # Delete existing stocks
         session.query(cls).filter_by(strategy_id=strategy_id).delete()
 
-        # Add new stocks
-        for symbol in symbols:
-            stock = cls(
+        # Add new stocks in one batch; generated ids are not needed
+        stocks = [
+            cls(
                 user_strategy_id=user_strategy_id,
                 strategy_id=strategy_id,
                 symbol=symbol.upper(),
                 weight=1.0
             )
-            session.add(stock)
+            for symbol in symbols
+        ]
+        session.bulk_save_objects(stocks, return_defaults=False)
 
         session.commit()
         return True
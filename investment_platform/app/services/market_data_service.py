@@ -6,7 +6,7 @@ Prioritizes local CSV files in data/tickercsv folder for faster access.
 """
 import logging
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from pathlib import Path
@@ -15,6 +15,7 @@ from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 import pytz
+from sqlalchemy import func
 
 from app.database import get_scoped_session, is_csv_backend, get_csv_storage
 from app.models import MarketDataCache, MarketDataMetadata
@@ -26,6 +27,9 @@ logger = logging.getLogger(__name__)
 TICKER_CSV_DIR = Path(__file__).parent.parent.parent / 'data' / 'tickercsv'
 SYMBOLS_LIST_FILE = TICKER_CSV_DIR / 'symbols_filtered.csv'
 
+# Thread pool size for loading several local CSV files at once
+MAX_CSV_LOAD_WORKERS = 8
+
 
 def get_available_symbols_from_list() -> list:
     """Load available symbols from symbols_filtered.csv."""
@@ -201,23 +205,30 @@ class MarketDataService:
         if df is None or df.empty:
             return 0
 
-        records = []
-        for idx, row in df.iterrows():
-            record_date = idx if isinstance(idx, date) else idx.date()
-            records.append({
-                'symbol': symbol,
-                'date': record_date,
-                'open': row.get('open'),
-                'high': row.get('high'),
-                'low': row.get('low'),
-                'close': row['close'],
-                'adj_close': row['adj_close'],
-                'volume': int(row['volume']) if pd.notna(row.get('volume')) else None
-            })
+        missing = {'close', 'adj_close'} - set(df.columns)
+        if missing:
+            raise KeyError(f"Missing required columns: {sorted(missing)}")
+
+        # Optional open/high/low/volume columns become NaN when absent
+        frame = df.reindex(columns=['open', 'high', 'low', 'close', 'adj_close', 'volume'])
+
+        # Convert dates and volumes once per frame rather than per row
+        dates = frame.index.date if isinstance(frame.index, pd.DatetimeIndex) else frame.index
+        volumes = np.trunc(frame['volume']).astype('Int64').to_numpy(dtype=object, na_value=None)
 
+        # Missing prices must reach the database as NULL; a Numeric column
+        # on PostgreSQL would store NaN as the value 'NaN'
+        frame = frame.astype(object).where(frame.notna(), None)
+
+        # One dict materialization for the whole frame
+        records = frame.assign(volume=volumes).to_dict('records')
+        for record, record_date in zip(records, dates):
+            record['symbol'] = symbol
+            record['date'] = record_date
+
+        # bulk_insert and the metadata refresh share one transaction;
+        # _update_metadata commits both
         MarketDataCache.bulk_insert(records)
-        session = get_scoped_session()
-        session.commit()
         self._update_metadata(symbol)
         return len(records)
 
@@ -238,8 +249,6 @@ class MarketDataService:
                     )
             return
 
-        metadata = MarketDataMetadata.get_or_create(symbol)
-        from sqlalchemy import func
         session = get_scoped_session()
         result = session.query(
             func.min(MarketDataCache.date),
@@ -248,12 +257,13 @@ class MarketDataService:
         ).filter(MarketDataCache.symbol == symbol).first()
 
         if result and result[0]:
-            metadata.update_after_fetch(
+            MarketDataMetadata.upsert_after_fetch(
+                symbol,
                 earliest=result[0],
                 latest=result[1],
                 total_records=result[2]
             )
-            session.commit()
+        session.commit()
 
     def _get_cached_data(self, symbol: str, start_date: date, end_date: date) -> pd.DataFrame:
         """Get data from cache as DataFrame."""
@@ -405,13 +415,22 @@ class MarketDataService:
         }
 
     def fetch_multiple_symbols(self, symbols: List[str], start_date: date = None, end_date: date = None) -> Dict[str, pd.DataFrame]:
-        """Fetch data for multiple symbols."""
+        """
+        Fetch data for multiple symbols.
+
+        Local CSV files are loaded concurrently into the memory cache first;
+        database cache fallbacks then run on the calling thread so scoped
+        sessions are not shared across threads.
+        """
+        uncached = [s for s in {s.upper() for s in symbols} if s not in self._local_csv_cache]
+        if len(uncached) > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_CSV_LOAD_WORKERS, len(uncached))) as executor:
+                list(executor.map(self._load_from_local_csv, uncached))
+
         results = {}
-        for i, symbol in enumerate(symbols):
+        for symbol in symbols:
             try:
                 results[symbol] = self.get_price_data(symbol, start_date, end_date)
-                if i < len(symbols) - 1:
-                    time.sleep(0.1)  # Reduced delay since we're using local files
             except Exception as e:
                 logger.error(f"Error fetching {symbol}: {e}")
                 results[symbol] = pd.DataFrame()
@@ -544,6 +544,7 @@ class CSVStorage:
         """Insert multiple market data records."""
         rows = self._read_all('market_data_cache')
         existing = {(r.get('symbol'), r.get('date')) for r in rows}
+        fetched_at = self._serialize_value(datetime.now(timezone.utc))
 
         for record in records:
             key = (record['symbol'], self._serialize_value(record['date']))
@@ -553,7 +554,7 @@ class CSVStorage:
                     if row.get('symbol') == record['symbol'] and row.get('date') == self._serialize_value(record['date']):
                         for k, v in record.items():
                             rows[i][k] = self._serialize_value(v)
-                        rows[i]['fetched_at'] = self._serialize_value(datetime.now(timezone.utc))
+                        rows[i]['fetched_at'] = fetched_at
                         break
             else:
                 # Insert new
@@ -567,7 +568,7 @@ class CSVStorage:
                     'close': self._serialize_value(record['close']),
                     'adj_close': self._serialize_value(record['adj_close']),
                     'volume': self._serialize_value(record.get('volume')),
-                    'fetched_at': self._serialize_value(datetime.now(timezone.utc)),
+                    'fetched_at': fetched_at,
                 }
                 rows.append(new_row)
                 existing.add(key)
@@ -14,6 +14,7 @@ Options:
     --days          Days of history to fetch (default: smart fill from last date)
     --full-refresh  Re-download all data from scratch (5 years)
     --delay         Delay between requests in seconds (default: 1.5)
+    --symbols-per-process  Symbols per download subprocess (default: 1)
     --debug         Print detailed debug output for troubleshooting
 
 Examples:
@@ -31,24 +32,27 @@ Examples:
 """
 import argparse
 import csv
+import html
+import mmap
 import os
+import pickle
+import re
 import socket
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
+from urllib.parse import urljoin
 
 # Force global socket timeout - catches DNS/SSL hangs that requests timeout misses
 socket.setdefaulttimeout(10)
 
 import requests
-
-try:
-    from bs4 import BeautifulSoup
-    BS4_AVAILABLE = True
-except ImportError:
-    BS4_AVAILABLE = False
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, Timeout
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
@@ -56,6 +60,28 @@ PROJECT_DIR = SCRIPT_DIR.parent
 DATA_DIR = PROJECT_DIR / 'data' / 'tickercsv'
 SYMBOLS_FILE = DATA_DIR / 'symbols_filtered.csv'
 
+# Cached Yahoo session (cookies + crumb) reused across runs and subprocesses
+CRUMB_CACHE = PROJECT_DIR / '.yahoo_session.pickle'
+CRUMB_CACHE_MAX_AGE = 12 * 3600  # seconds
+CRUMB_URL = 'https://query2.finance.yahoo.com/v1/test/getcrumb'
+
+# v8 chart API (v7 download endpoint is deprecated); the symbol placeholder is
+# substituted per request so one prepared request serves a whole date range
+CHART_URL = 'https://query2.finance.yahoo.com/v8/finance/chart/{symbol}'
+SYMBOL_PLACEHOLDER = '__SYMBOL__'
+
+# --batch RESULT status for symbols left undone by an auth error / rate limit;
+# the parent retries them in a fresh subprocess (and so a fresh session)
+AUTH_RESULT = 'auth'
+
+# Consent page form parsing (markup is simple and stable, no HTML parser needed)
+_FORM_RE = re.compile(r'<form\b([^>]*)>(.*?)</form>', re.IGNORECASE | re.DOTALL)
+_INPUT_RE = re.compile(r'<input\b([^>]*)>', re.IGNORECASE)
+_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+# Shared HTTP timeout for chart requests; retries are handled by the caller
+REQUEST_TIMEOUT = Timeout(connect=5, read=10)
+
 # CSV columns
 CSV_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
 
@@ -93,16 +119,8 @@ def load_symbols() -> list:
     return symbols
 
 
-def get_yahoo_session() -> tuple:
-    """
-    Get a requests session with Yahoo Finance cookies and crumb token.
-
-    Visits fc.yahoo.com to get the A3 auth cookie, then fetches the crumb
-    from the crumb API endpoint.
-
-    Returns:
-        (session, crumb) tuple, or (None, None) on failure
-    """
+def _new_yahoo_session() -> requests.Session:
+    """Create a requests session with browser-like headers."""
     session = requests.Session()
     session.headers.update({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
@@ -110,6 +128,121 @@ def get_yahoo_session() -> tuple:
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.5',
     })
+    adapter = HTTPAdapter(max_retries=Retry(total=0))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _parse_attrs(tag_attrs: str) -> dict:
+    """Parse quoted HTML attributes into a dict with lowercased names."""
+    return {
+        m.group(1).lower(): html.unescape(m.group(2) if m.group(2) is not None else m.group(3))
+        for m in _ATTR_RE.finditer(tag_attrs)
+    }
+
+
+def parse_consent_form(page: str, page_url: str) -> tuple:
+    """
+    Extract the consent form's action URL and input fields.
+
+    Prefers the first POST form, falling back to the first form on the page.
+
+    Returns:
+        (action_url, inputs) tuple, or (None, None) if the page has no form
+    """
+    forms = [(_parse_attrs(attrs), body) for attrs, body in _FORM_RE.findall(page)]
+    if not forms:
+        return None, None
+
+    attrs, body = next(
+        (f for f in forms if f[0].get('method', '').lower() == 'post'),
+        forms[0]
+    )
+    inputs = {}
+    for input_attrs in _INPUT_RE.findall(body):
+        inp = _parse_attrs(input_attrs)
+        if inp.get('name'):
+            inputs[inp['name']] = inp.get('value', '')
+
+    return urljoin(page_url, attrs.get('action', page_url)), inputs
+
+
+def load_cached_session() -> tuple:
+    """
+    Load a previously saved Yahoo session from CRUMB_CACHE.
+
+    The cache is only used if it is younger than CRUMB_CACHE_MAX_AGE and the
+    cookies still authenticate against the crumb endpoint.
+
+    Returns:
+        (session, crumb) tuple, or (None, None) if no usable cache exists
+    """
+    try:
+        if not CRUMB_CACHE.exists():
+            return None, None
+        if time.time() - CRUMB_CACHE.stat().st_mtime > CRUMB_CACHE_MAX_AGE:
+            return None, None
+
+        with open(CRUMB_CACHE, 'rb') as f:
+            cached = pickle.load(f)
+
+        session = _new_yahoo_session()
+        session.cookies.update(cached['cookies'])
+        crumb = cached.get('crumb')
+
+        # Cheap check that the cookies are still accepted
+        resp = session.head(CRUMB_URL, timeout=10)
+        if resp.status_code != 200:
+            return None, None
+
+        return session, crumb
+    except Exception:
+        return None, None
+
+
+def save_cached_session(session: requests.Session, crumb: str):
+    """Atomically write session cookies and crumb to CRUMB_CACHE."""
+    tmp_path = CRUMB_CACHE.with_name(CRUMB_CACHE.name + f'.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'cookies': session.cookies, 'crumb': crumb}, f)
+        os.replace(tmp_path, CRUMB_CACHE)
+    except Exception:
+        try:
+            tmp_path.unlink()
+        except Exception:
+            pass
+
+
+def clear_cached_session():
+    """Remove the cached session so the next call re-authenticates."""
+    try:
+        CRUMB_CACHE.unlink()
+    except Exception:
+        pass
+
+
+def get_yahoo_session(use_cache: bool = True) -> tuple:
+    """
+    Get a requests session with Yahoo Finance cookies and crumb token.
+
+    Reuses the session cached in CRUMB_CACHE when it is still valid.
+    Otherwise visits fc.yahoo.com to get the A3 auth cookie, then fetches
+    the crumb from the crumb API endpoint and caches the result.
+
+    Args:
+        use_cache: If False, always re-authenticate
+
+    Returns:
+        (session, crumb) tuple, or (None, None) on failure
+    """
+    if use_cache:
+        session, crumb = load_cached_session()
+        if session is not None:
+            return session, crumb
+
+    session = _new_yahoo_session()
 
     try:
         # Step 1: Visit fc.yahoo.com to get the A3 auth cookie
@@ -117,10 +250,7 @@ def get_yahoo_session() -> tuple:
 
         # Step 2: Get crumb using the session cookies
         crumb = None
-        crumb_resp = session.get(
-            'https://query2.finance.yahoo.com/v1/test/getcrumb',
-            timeout=10
-        )
+        crumb_resp = session.get(CRUMB_URL, timeout=10)
         if crumb_resp.status_code == 200 and crumb_resp.text.strip():
             crumb = crumb_resp.text.strip()
             if '\\u' in crumb:
@@ -130,25 +260,14 @@ def get_yahoo_session() -> tuple:
         if not crumb:
             session.get('https://finance.yahoo.com/quote/AAPL/', timeout=15, allow_redirects=True)
 
-            if BS4_AVAILABLE:
-                resp = session.get('https://finance.yahoo.com/', timeout=15, allow_redirects=True)
-                if 'consent' in resp.url or 'guce.yahoo' in resp.url:
-                    print("  (handling consent redirect...)")
-                    soup = BeautifulSoup(resp.text, 'html.parser')
-                    form = soup.find('form', {'method': 'post'}) or soup.find('form')
-                    if form:
-                        action = form.get('action', resp.url)
-                        inputs = {}
-                        for inp in form.find_all('input'):
-                            name = inp.get('name')
-                            if name:
-                                inputs[name] = inp.get('value', '')
-                        session.post(action, data=inputs, timeout=15, allow_redirects=True)
-
-            crumb_resp = session.get(
-                'https://query2.finance.yahoo.com/v1/test/getcrumb',
-                timeout=10
-            )
+            resp = session.get('https://finance.yahoo.com/', timeout=15, allow_redirects=True)
+            if 'consent' in resp.url or 'guce.yahoo' in resp.url:
+                print("  (handling consent redirect...)")
+                action, inputs = parse_consent_form(resp.text, resp.url)
+                if action:
+                    session.post(action, data=inputs, timeout=15, allow_redirects=True)
+
+            crumb_resp = session.get(CRUMB_URL, timeout=10)
             if crumb_resp.status_code == 200 and crumb_resp.text.strip():
                 crumb = crumb_resp.text.strip()
                 if '\\u' in crumb:
@@ -156,6 +275,7 @@ def get_yahoo_session() -> tuple:
 
         if crumb:
             print("Session ready (crumb: yes)")
+            save_cached_session(session, crumb)
         else:
             print("WARNING: Could not extract crumb token. Trying downloads without crumb...")
 
@@ -170,34 +290,76 @@ def get_existing_last_date(symbol: str) -> date:
     """
     Check existing CSV file for the last date of data.
 
+    CSV files are kept sorted by date, so only the tail is inspected: the
+    file is memory-mapped and scanned backwards line by line until a row
+    with a valid date is found.
+
     Returns:
         The last date in the CSV, or None if no file/data exists.
     """
     csv_path = DATA_DIR / f'{symbol_to_filename(symbol)}.csv'
-    if not csv_path.exists():
-        return None
 
     try:
-        last_date = None
-        with open(csv_path, 'r') as f:
-            reader = csv.reader(f)
-            header = next(reader, None)  # skip header
-            if not header:
+        with open(csv_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
                 return None
-            for row in reader:
-                if row and row[0]:
-                    date_str = row[0].split(' ')[0].split('T')[0]
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = len(mm)
+                while end > 0:
+                    start = mm.rfind(b'\n', 0, end) + 1
+                    if start == 0:
+                        return None  # reached the header line
+                    line = mm[start:end].strip()
+                    end = start - 1
+                    if not line:
+                        continue
+                    date_str = line.split(b',', 1)[0].decode('ascii', 'ignore')
+                    date_str = date_str.split(' ')[0].split('T')[0]
                     try:
-                        last_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+                        return datetime.strptime(date_str, '%Y-%m-%d').date()
                     except ValueError:
                         continue
-        return last_date
+        return None
     except Exception:
         return None
 
 
+@lru_cache(maxsize=1024)
+def _date_to_ts(d: date) -> int:
+    """Convert a date to a Unix timestamp at local midnight."""
+    return int(datetime.combine(d, datetime.min.time()).timestamp())
+
+
+def build_chart_request(session: requests.Session, crumb: str,
+                        start_date: date, end_date: date) -> tuple:
+    """
+    Prepare a chart API request for a date range with a placeholder symbol.
+
+    Symbols sharing the same (start_date, end_date) can reuse the result, so
+    params encoding and header/cookie merging happen once per date range.
+
+    Returns:
+        (prepared_request, send_kwargs) tuple for session.send()
+    """
+    params = {
+        'period1': _date_to_ts(start_date),
+        'period2': _date_to_ts(end_date) + 86400,
+        'interval': '1d',
+    }
+    if crumb:
+        params['crumb'] = crumb
+
+    url = CHART_URL.format(symbol=SYMBOL_PLACEHOLDER)
+    prepped = session.prepare_request(requests.Request('GET', url, params=params))
+    send_kwargs = session.merge_environment_settings(prepped.url, {}, None, None, None)
+    send_kwargs['timeout'] = REQUEST_TIMEOUT
+    send_kwargs['stream'] = True  # body is only read on success
+    return prepped, send_kwargs
+
+
 def download_symbol(session: requests.Session, crumb: str, symbol: str,
-                    start_date: date, end_date: date, debug: bool = False) -> list:
+                    start_date: date, end_date: date, debug: bool = False,
+                    template: tuple = None) -> list:
     """
     Download OHLCV data for a single symbol from Yahoo Finance v8 chart API.
 
@@ -208,47 +370,35 @@ def download_symbol(session: requests.Session, crumb: str, symbol: str,
         start_date: Start date for data
         end_date: End date for data
         debug: Print detailed debug output
+        template: Optional result of build_chart_request() for this date range
 
     Returns:
         List of rows [Date, Open, High, Low, Close, Volume], or empty list on failure.
         Returns None to signal session refresh needed (auth error / rate limit).
     """
-    # Convert dates to Unix timestamps
-    period1 = int(datetime.combine(start_date, datetime.min.time()).timestamp())
-    period2 = int(datetime.combine(end_date, datetime.min.time()).timestamp()) + 86400
-
-    params = {
-        'period1': period1,
-        'period2': period2,
-        'interval': '1d',
-    }
-    if crumb:
-        params['crumb'] = crumb
+    if template is None:
+        template = build_chart_request(session, crumb, start_date, end_date)
+    prepped, send_kwargs = template
 
-    if debug:
-        print(f"\n  DEBUG: period1={period1} period2={period2}")
-
-    # Use v8 chart API (v7 download endpoint is deprecated)
-    url = f'https://query2.finance.yahoo.com/v8/finance/chart/{symbol}'
+    req = prepped.copy()
+    req.url = req.url.replace(SYMBOL_PLACEHOLDER, requests.utils.requote_uri(symbol), 1)
 
-    resp = None
     try:
         if debug:
-            print(f"\n  DEBUG: Trying {url}")
-        resp = session.get(url, params=params, timeout=(5, 10))
+            print(f"\n  DEBUG: Trying {req.url}")
+        resp = session.send(req, **send_kwargs)
         if debug:
-            print(f"  DEBUG: Status={resp.status_code}, Length={len(resp.text)}")
+            print(f"  DEBUG: Status={resp.status_code}, "
+                  f"Content-Length={resp.headers.get('Content-Length', 'unknown')}")
     except Exception as e:
         if debug:
             print(f"  DEBUG: Exception: {e}")
         print(f"  {symbol}: Request failed ({e})")
         return []
 
-    if resp is None:
-        print(f"  {symbol}: All endpoints failed")
-        return []
-
     try:
+        # Error statuses return without reading the (often HTML) body;
+        # the finally clause closes the streamed response
         if resp.status_code in (401, 403):
             return None  # Signal to refresh session
 
@@ -260,7 +410,14 @@ def download_symbol(session: requests.Session, crumb: str, symbol: str,
             print(f"  {symbol}: Rate limited (429)")
             return None  # Signal to retry
 
-        resp.raise_for_status()
+        if resp.status_code != 200:
+            print(f"  {symbol}: HTTP {resp.status_code}")
+            return []
+
+        if resp.headers.get('Content-Length') == '0':
+            if debug:
+                print(f"  DEBUG: Empty response body")
+            return []
 
         # Parse JSON response from v8 chart API
         data = resp.json()
@@ -324,6 +481,8 @@ def download_symbol(session: requests.Session, crumb: str, symbol: str,
             import traceback
             traceback.print_exc()
         return []
+    finally:
+        resp.close()
 
 
 def save_symbol_csv(symbol: str, new_rows: list, full_refresh: bool = False):
@@ -457,6 +616,11 @@ def run_single_symbol(yahoo_symbol, file_symbol, start_str, end_str,
 
     rows = download_symbol(session, crumb, yahoo_symbol, start_date, end_date, debug=debug)
 
+    if rows is None:
+        # Auth error / rate limit - drop cached cookies so the next run re-authenticates
+        clear_cached_session()
+        sys.exit(1)
+
     if not rows:
         sys.exit(1)
 
@@ -465,10 +629,135 @@ def run_single_symbol(yahoo_symbol, file_symbol, start_str, end_str,
     sys.exit(0)
 
 
-def run_fetch(symbols, days=None, full_refresh=False, delay=1.5, debug=False):
+def download_batch_subprocess(symbol_pairs, start_date, end_date, full_refresh=False,
+                              delay=1.5, debug=False, timeout=20):
+    """
+    Download several symbols that share a date range in one subprocess.
+
+    The child reuses one connection and one prepared chart request for the
+    whole chunk. The kill timeout scales with the chunk size.
+
+    Args:
+        symbol_pairs: List of (file_symbol, yahoo_symbol) tuples
+
+    Returns: (results: dict file_symbol -> rows_count, timed_out: bool)
+        Symbols missing from results were not reached by the child. Symbols
+        stopped by an auth error / rate limit map to AUTH_RESULT instead of
+        a row count.
+    """
+    script = os.path.abspath(__file__)
+    cmd = [sys.executable, script, '--batch', str(start_date), str(end_date)]
+    cmd += [f'{yahoo_symbol}:{file_symbol}' for file_symbol, yahoo_symbol in symbol_pairs]
+    cmd += ['--delay', str(delay)]
+    if full_refresh:
+        cmd.append('--full-refresh')
+    if debug:
+        cmd.append('--debug')
+
+    total_timeout = timeout * len(symbol_pairs) + delay * (len(symbol_pairs) - 1)
+    t_start = time.time()
+    timed_out = False
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            stdout, stderr = proc.communicate(timeout=total_timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            stdout, stderr = proc.communicate()
+            timed_out = True
+            elapsed = time.time() - t_start
+            print(f"[batch killed after {elapsed:.0f}s] ", end='', flush=True)
+
+        if debug and stderr:
+            print(f"  DEBUG stderr: {stderr[:200]}")
+
+        results = {}
+        for line in stdout.splitlines():
+            parts = line.split()
+            if len(parts) == 3 and parts[0] == 'RESULT':
+                if parts[2] == AUTH_RESULT:
+                    results[parts[1]] = AUTH_RESULT
+                    continue
+                try:
+                    results[parts[1]] = int(parts[2])
+                except ValueError:
+                    continue
+        return results, timed_out
+    except Exception as e:
+        elapsed = time.time() - t_start
+        print(f"[error after {elapsed:.0f}s: {e}] ", end='', flush=True)
+        return {}, False
+
+
+def run_batch_symbols(start_str, end_str, symbol_specs, full_refresh=False,
+                      delay=1.5, debug=False):
+    """
+    Called when --batch mode: download each YAHOO_SYM:FILE_SYM spec for one
+    date range, save CSVs, and print a "RESULT <file_symbol> <rows>" line per
+    symbol. Stops early on auth errors / rate limiting, reporting the failed
+    symbol and every one after it as "RESULT <file_symbol> auth".
+    """
+    start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+    end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+
+    session, crumb = get_yahoo_session()
+    if session is None:
+        sys.exit(1)
+
+    template = build_chart_request(session, crumb, start_date, end_date)
+
+    for k, spec in enumerate(symbol_specs):
+        yahoo_symbol, _, file_symbol = spec.rpartition(':')
+        rows = download_symbol(session, crumb, yahoo_symbol, start_date, end_date,
+                               debug=debug, template=template)
+
+        if rows is None:
+            # Auth error / rate limit - remaining symbols would fail too
+            clear_cached_session()
+            for remaining in symbol_specs[k:]:
+                print(f"RESULT {remaining.rpartition(':')[2]} {AUTH_RESULT}", flush=True)
+            break
+
+        if rows:
+            save_symbol_csv(file_symbol, rows, full_refresh=full_refresh)
+        print(f"RESULT {file_symbol} {len(rows)}", flush=True)
+
+        if k < len(symbol_specs) - 1:
+            time.sleep(delay)
+
+    sys.exit(0)
+
+
+def _chunk_by_date_range(plan, chunk_size):
+    """
+    Split consecutive plan entries into chunks of up to chunk_size symbols
+    that share the same (start_date, end_date).
+    """
+    chunks = []
+    for entry in plan:
+        if (chunks and len(chunks[-1]) < chunk_size
+                and chunks[-1][0][3:5] == entry[3:5]):
+            chunks[-1].append(entry)
+        else:
+            chunks.append([entry])
+    return chunks
+
+
+def run_fetch(symbols, days=None, full_refresh=False, delay=1.5, debug=False,
+              symbols_per_process=1):
     """
     Run one fetch cycle for the given symbols.
 
+    Args:
+        symbols_per_process: Symbols downloaded per subprocess. 1 (default)
+            keeps the per-symbol 20s kill timeout; larger values share one
+            connection across consecutive symbols with the same date range.
+
     Returns:
         stats dict with processed/success/failed/skipped/rows_added counts
     """
@@ -486,7 +775,10 @@ def run_fetch(symbols, days=None, full_refresh=False, delay=1.5, debug=False):
     print(f"Symbols: {len(symbols)}")
     print(f"Output:  {DATA_DIR}")
     print(f"Mode:    {'Full refresh' if full_refresh else 'Smart fill'}")
-    print(f"Method:  subprocess per symbol (20s kill timeout)")
+    if symbols_per_process > 1:
+        print(f"Method:  subprocess per {symbols_per_process} symbols (20s/symbol kill timeout)")
+    else:
+        print(f"Method:  subprocess per symbol (20s kill timeout)")
     print(f"Batch:   100 symbols per session")
     print(f"Delay:   {delay}s between requests")
     print()
@@ -501,6 +793,21 @@ def run_fetch(symbols, days=None, full_refresh=False, delay=1.5, debug=False):
         'rows_added': 0,
     }
 
+    # Smart fill: read every CSV's last date up front so symbols that are
+    # already current skip the session setup and rate-limit delay entirely
+    smart_fill = not full_refresh and not days
+    last_dates = {}
+    if smart_fill:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            last_dates = dict(zip(symbols, executor.map(get_existing_last_date, symbols)))
+        needs_fetch = [s for s in symbols if last_dates[s] is None or last_dates[s] < today]
+        up_to_date = len(symbols) - len(needs_fetch)
+        stats['skipped'] += up_to_date
+        stats['processed'] += up_to_date
+        print(f"Already up to date: {up_to_date} symbols")
+        print(f"Needs fetch:        {len(needs_fetch)} symbols")
+        symbols = needs_fetch
+
     # Process symbols in batches with a fresh session per batch
     for batch_start in range(0, len(symbols), BATCH_SIZE):
         batch = symbols[batch_start:batch_start + BATCH_SIZE]
@@ -523,36 +830,81 @@ def run_fetch(symbols, days=None, full_refresh=False, delay=1.5, debug=False):
                 continue
         print("-" * 60)
 
+        # Work out each symbol's date range
+        plan = []
         for j, symbol in enumerate(batch):
             i = batch_start + j + 1  # overall index
-            stats['processed'] += 1
+            if full_refresh:
+                start_date = today - timedelta(days=default_history_days)
+            elif days:
+                start_date = today - timedelta(days=days)
+            else:
+                # Smart fill: resume after the last date in the existing CSV,
+                # or fetch 5 years when there is no existing data
+                last_date = last_dates.get(symbol)
+                if last_date:
+                    start_date = last_date + timedelta(days=1)
+                else:
+                    start_date = today - timedelta(days=default_history_days)
+            plan.append((i, symbol, filename_to_yahoo_symbol(symbol), start_date, today))
 
-            try:
-                yahoo_symbol = filename_to_yahoo_symbol(symbol)
+        if symbols_per_process > 1:
+            for chunk in _chunk_by_date_range(plan, symbols_per_process):
+                first_i, start_date, end_date = chunk[0][0], chunk[0][3], chunk[0][4]
+                now = datetime.now().strftime('%H:%M:%S')
+                print(f"[{now}] [{first_i}-{chunk[-1][0]}/{len(symbols)}] "
+                      f"{len(chunk)} symbols: {start_date} to {end_date} ...", flush=True)
 
-                # Determine date range for this symbol
-                if full_refresh:
-                    start_date = today - timedelta(days=default_history_days)
-                    end_date = today
-                elif days:
-                    start_date = today - timedelta(days=days)
-                    end_date = today
-                else:
-                    # Smart fill: check existing CSV
-                    last_date = get_existing_last_date(symbol)
-                    if last_date:
-                        start_date = last_date + timedelta(days=1)
-                        end_date = today
-                        if start_date > end_date:
-                            now = datetime.now().strftime('%H:%M:%S')
-                            print(f"[{now}] [{i}/{len(symbols)}] {symbol}: Already up to date (last: {last_date})")
-                            stats['skipped'] += 1
-                            continue
+                results, timed_out = download_batch_subprocess(
+                    [(symbol, yahoo_symbol) for _, symbol, yahoo_symbol, _, _ in chunk],
+                    start_date, end_date,
+                    full_refresh=full_refresh, delay=delay, debug=debug, timeout=20
+                )
+
+                # The child dropped its cached cookies on the auth error, so a
+                # second subprocess re-authenticates before retrying the rest
+                auth_pairs = [(symbol, yahoo_symbol) for _, symbol, yahoo_symbol, _, _ in chunk
+                              if results.get(symbol) == AUTH_RESULT]
+                if auth_pairs:
+                    print(f"  Auth error - retrying {len(auth_pairs)} symbols "
+                          f"with a fresh session ...", flush=True)
+                    time.sleep(delay)
+                    for symbol, _ in auth_pairs:
+                        del results[symbol]
+                    retry_results, retry_timed_out = download_batch_subprocess(
+                        auth_pairs, start_date, end_date,
+                        full_refresh=full_refresh, delay=delay, debug=debug, timeout=20
+                    )
+                    results.update(retry_results)
+                    timed_out = timed_out or retry_timed_out
+
+                for i, symbol, _, _, _ in chunk:
+                    stats['processed'] += 1
+                    count = results.get(symbol)
+                    if count is None:
+                        status = "SKIPPED (timed out)" if timed_out else "no data"
+                        stats['failed'] += 1
+                    elif count == AUTH_RESULT:
+                        status = "SKIPPED (auth error)"
+                        stats['failed'] += 1
+                    elif count == 0:
+                        status = "no data"
+                        stats['failed'] += 1
                     else:
-                        # No existing data, fetch 5 years
-                        start_date = today - timedelta(days=default_history_days)
-                        end_date = today
+                        status = f"{count} rows"
+                        stats['success'] += 1
+                        stats['rows_added'] += count
+                    print(f"    {symbol}: {status}")
+
+                # Rate limiting delay (except after the last chunk)
+                if chunk[-1][0] < len(symbols):
+                    time.sleep(delay)
+            continue
 
+        for i, symbol, yahoo_symbol, start_date, end_date in plan:
+            stats['processed'] += 1
+
+            try:
                 now = datetime.now().strftime('%H:%M:%S')
                 print(f"[{now}] [{i}/{len(symbols)}] {symbol}: {start_date} to {end_date} ...", end=' ', flush=True)
 
@@ -643,6 +995,20 @@ def main():
         metavar='HOURS',
         help='Run continuously, repeating every N hours (default: 24)'
     )
+    parser.add_argument(
+        '--symbols-per-process',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Download up to N symbols with the same date range per subprocess, '
+             'reusing one connection (default: 1; up to 20 where SSL hangs are not a concern)'
+    )
+    parser.add_argument(
+        '--batch',
+        nargs='+',
+        metavar='ARG',
+        help=argparse.SUPPRESS  # internal: START END YAHOO_SYM:FILE_SYM ... and exit
+    )
     parser.add_argument(
         '--single',
         nargs=4,
@@ -660,6 +1026,14 @@ def main():
         )
         return
 
+    # Internal multi-symbol mode (called by subprocess)
+    if args.batch:
+        run_batch_symbols(
+            args.batch[0], args.batch[1], args.batch[2:],
+            full_refresh=args.full_refresh, delay=args.delay, debug=args.debug
+        )
+        return
+
     # Ensure output directory exists
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -712,7 +1086,8 @@ def main():
         try:
             while True:
                 run_fetch(symbols, days=args.days, full_refresh=args.full_refresh,
-                          delay=args.delay, debug=args.debug)
+                          delay=args.delay, debug=args.debug,
+                          symbols_per_process=args.symbols_per_process)
 
                 # Only full-refresh on the first run
                 args.full_refresh = False
@@ -735,7 +1110,8 @@ def main():
                 pass
     else:
         run_fetch(symbols, days=args.days, full_refresh=args.full_refresh,
-                  delay=args.delay, debug=args.debug)
+                  delay=args.delay, debug=args.debug,
+                  symbols_per_process=args.symbols_per_process)
         print("Done!")
 
 
@@ -11,18 +11,26 @@ Usage:
 Options:
     --drop-existing       Drop existing tables before creating (WARNING: data loss)
     --verify-only         Only verify database, do not create or modify
+    --load-csv            Bulk load scraped CSVs from data/tickercsv into market_data_cache
 
-Note: For market data, use the CSV scraper instead:
+Note: For market data, use the CSV scraper first, then load the CSVs:
     python scripts/fetch_yahoo_data.py
+    python scripts/init_database.py --load-csv
 """
 import argparse
+import csv
 import sys
 import os
-from datetime import date
+from contextlib import nullcontext
+from datetime import date, datetime, timezone
+from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from flask import has_app_context
+from sqlalchemy import create_engine, func, insert, inspect, select
+
 from app import create_app
 from app.database import get_scoped_session, create_all, drop_all, get_engine
 from app.config import get_config
@@ -32,6 +40,18 @@ from app.models import (
 )
 from app.data.strategies import STRATEGIES
 
+# Output directory of scripts/fetch_yahoo_data.py
+TICKER_CSV_DIR = Path(__file__).parent.parent / 'data' / 'tickercsv'
+
+# Files loaded per transaction by load_market_data_csvs
+LOAD_COMMIT_EVERY = 25
+
+
+def _app_context(app):
+    """Push an app context unless one is already active (main() pushes one)."""
+    return nullcontext() if has_app_context() else app.app_context()
+
+
 def create_tables(app, drop_existing=False):
     """
     Create all database tables.
@@ -39,8 +59,11 @@ def create_tables(app, drop_existing=False):
     Args:
         app: Flask application instance
         drop_existing: If True, drop existing tables first
+
+    Returns:
+        List of table names present after creation
     """
-    with app.app_context():
+    with _app_context(app):
         if drop_existing:
             print("WARNING: Dropping existing tables...")
             drop_all()
@@ -51,11 +74,11 @@ def create_tables(app, drop_existing=False):
         print("Tables created successfully!")
 
         # List created tables
-        from sqlalchemy import inspect
         engine = get_engine()
         inspector = inspect(engine)
         tables = inspector.get_table_names()
         print(f"\nTables in database: {tables}")
+        return tables
 
 
 def init_default_portfolio(app, user_id='default'):
@@ -66,7 +89,7 @@ def init_default_portfolio(app, user_id='default'):
         app: Flask application instance
         user_id: User ID for the portfolio
     """
-    with app.app_context():
+    with _app_context(app):
         session = get_scoped_session()
         existing = session.query(PortfolioState).filter_by(user_id=user_id).first()
 
@@ -97,86 +120,338 @@ def init_strategy_customizations(app, user_id='default'):
         app: Flask application instance
         user_id: User ID
     """
-    with app.app_context():
+    with _app_context(app):
         print("Initializing strategy customizations...")
         session = get_scoped_session()
 
-        for strategy_id in STRATEGIES.keys():
-            existing = session.query(StrategyCustomization).filter_by(
-                user_id=user_id,
-                strategy_id=strategy_id
-            ).first()
+        existing = {
+            row[0] for row in session.query(StrategyCustomization.strategy_id)
+            .filter_by(user_id=user_id).all()
+        }
 
-            if existing:
+        to_add = []
+        for strategy_id in STRATEGIES:
+            if strategy_id in existing:
                 print(f"  {strategy_id}: already exists")
                 continue
 
-            customization = StrategyCustomization(
-                user_id=user_id,
-                strategy_id=strategy_id,
-                confidence_level=50,
-                trade_frequency='medium',
-                max_position_size=15,
-                stop_loss_percent=10,
-                take_profit_percent=20,
-                auto_rebalance=True,
-                reinvest_dividends=True
-            )
-            session.add(customization)
+            to_add.append({
+                'user_id': user_id,
+                'strategy_id': strategy_id,
+                'confidence_level': 50,
+                'trade_frequency': 'medium',
+                'max_position_size': 15,
+                'stop_loss_percent': 10,
+                'take_profit_percent': 20,
+                'auto_rebalance': True,
+                'reinvest_dividends': True
+            })
             print(f"  {strategy_id}: created")
 
+        if to_add:
+            session.execute(insert(StrategyCustomization), to_add)
         session.commit()
         print("Strategy customizations initialized!")
 
 
-def verify_database(app):
+def csv_filename_to_symbol(stem):
     """
-    Verify database is properly initialized.
+    Map a CSV file stem to the symbol the app looks up (_GSPC -> ^GSPC).
+
+    Futures keep their file names (CL_F, GC_F), matching the symbol
+    universe and MarketDataService.list_available_symbols.
+    """
+    if stem.startswith('_'):
+        return '^' + stem[1:]
+    return stem
+
+
+def read_market_data_csv(csv_path, symbol, fetched_at):
+    """
+    Read a scraped Date,Open,High,Low,Close,Volume CSV into insert rows.
+
+    Args:
+        csv_path: Path to the CSV file
+        symbol: Ticker symbol to store the rows under
+        fetched_at: Timestamp recorded on every row
+
+    Returns:
+        List of dicts keyed by market_data_cache column name
+    """
+    rows = []
+    with open(csv_path, 'r', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # skip header
+        for row in reader:
+            if len(row) < 6 or not row[0]:
+                continue
+            close = float(row[4])
+            rows.append({
+                'symbol': symbol,
+                'date': date.fromisoformat(row[0][:10]),
+                'open': float(row[1]),
+                'high': float(row[2]),
+                'low': float(row[3]),
+                'close': close,
+                'adj_close': close,
+                'volume': int(float(row[5])),
+                'fetched_at': fetched_at,
+            })
+    return rows
+
+
+def _insert_market_data(session, symbol, rows):
+    """
+    Insert rows for one symbol and refresh its metadata, without committing.
+
+    Dates already cached for the symbol are skipped (INSERT OR IGNORE on
+    SQLite, a pre-filter on other backends).
+
+    Returns:
+        Number of rows actually inserted
+    """
+    table = MarketDataCache.__table__
+    if session.get_bind().dialect.name == 'sqlite':
+        stmt = table.insert().prefix_with('OR IGNORE')
+    else:
+        existing = {
+            r[0] for r in session.execute(
+                select(table.c.date).where(table.c.symbol == symbol)
+            )
+        }
+        rows = [r for r in rows if r['date'] not in existing]
+        stmt = table.insert()
+
+    inserted = 0
+    if rows:
+        result = session.execute(stmt, rows)
+        # OR IGNORE skips duplicates, so count what the driver wrote; fall
+        # back to the submitted rows if it cannot report a rowcount
+        inserted = result.rowcount if result.rowcount >= 0 else len(rows)
+
+    # Refresh metadata from what is now cached
+    earliest, latest, total = session.query(
+        func.min(MarketDataCache.date),
+        func.max(MarketDataCache.date),
+        func.count(MarketDataCache.id)
+    ).filter(MarketDataCache.symbol == symbol).one()
+    if earliest:
+        MarketDataMetadata.upsert_after_fetch(symbol, earliest, latest, total)
+
+    return inserted
+
+
+def bulk_load_market_data(app, csv_path, symbol):
+    """
+    Bulk load one scraped CSV file into market_data_cache.
+
+    Rows are inserted with a single executemany instead of per-row ORM
+    inserts, and the symbol's metadata is refreshed in the same transaction.
 
     Args:
         app: Flask application instance
+        csv_path: Path to a Date,Open,High,Low,Close,Volume CSV file
+        symbol: Ticker symbol to store the rows under
+
+    Returns:
+        Number of rows inserted
     """
-    print("\n" + "="*50)
-    print("Database Verification")
-    print("="*50)
+    rows = read_market_data_csv(csv_path, symbol, datetime.now(timezone.utc))
+    if not rows:
+        return 0
 
-    with app.app_context():
-        # Check tables exist
-        from sqlalchemy import inspect
-        engine = get_engine()
-        inspector = inspect(engine)
-        tables = inspector.get_table_names()
+    with _app_context(app):
+        session = get_scoped_session()
+        count = _insert_market_data(session, symbol, rows)
+        session.commit()
+    return count
 
-        expected_tables = [
-            'portfolio_state', 'holdings', 'trades_history',
-            'strategy_customizations', 'market_data_cache', 'market_data_metadata'
-        ]
 
-        print("\nTable Status:")
-        for table in expected_tables:
-            status = "OK" if table in tables else "MISSING"
-            print(f"  {table}: {status}")
+def load_market_data_csvs(app, data_dir=TICKER_CSV_DIR, commit_every=LOAD_COMMIT_EVERY):
+    """
+    Bulk load every scraped ticker CSV into market_data_cache.
+
+    All files are loaded in one session with autoflush disabled, committing
+    every commit_every files rather than once per file. If a file fails, the
+    batch is rolled back and the other files in it are replayed, so only the
+    bad file is lost. On SQLite, fsync and the rollback journal are relaxed
+    for the duration of the load and restored afterwards.
 
-        # Check record counts
+    Args:
+        app: Flask application instance
+        data_dir: Directory containing one CSV file per symbol
+        commit_every: Number of files per transaction
+    """
+    data_dir = Path(data_dir)
+    csv_files = sorted(p for p in data_dir.glob('*.csv') if p.name != 'symbols_filtered.csv')
+    print(f"\nLoading market data from {data_dir} ({len(csv_files)} files)...")
+
+    fetched_at = datetime.now(timezone.utc)
+    total_rows = 0
+    loaded = 0
+    failed = 0
+    pending = []  # (symbol, rows, inserted) written since the last commit
+
+    with _app_context(app):
         session = get_scoped_session()
-        print("\nRecord Counts:")
-        print(f"  Portfolios: {session.query(PortfolioState).count()}")
-        print(f"  Holdings: {session.query(Holdings).count()}")
-        print(f"  Trades: {session.query(TradesHistory).count()}")
-        print(f"  Strategy Customizations: {session.query(StrategyCustomization).count()}")
-        print(f"  Market Data Cache: {session.query(MarketDataCache).count()}")
-        print(f"  Market Data Metadata: {session.query(MarketDataMetadata).count()}")
-
-        # Check market data coverage
-        if session.query(MarketDataMetadata).count() > 0:
-            print("\nMarket Data Coverage:")
-            for meta in session.query(MarketDataMetadata).limit(10).all():
-                print(f"  {meta.symbol}: {meta.total_records} records "
-                      f"({meta.earliest_date} to {meta.latest_date})")
-
-            remaining = session.query(MarketDataMetadata).count() - 10
-            if remaining > 0:
-                print(f"  ... and {remaining} more symbols")
+        conn = session.connection()
+        is_sqlite = conn.dialect.name == 'sqlite'
+        if is_sqlite:
+            journal_mode = conn.exec_driver_sql('PRAGMA journal_mode').scalar()
+            synchronous = conn.exec_driver_sql('PRAGMA synchronous').scalar()
+            conn.exec_driver_sql('PRAGMA synchronous=OFF')
+            conn.exec_driver_sql('PRAGMA journal_mode=MEMORY')
+
+        def commit_pending():
+            nonlocal total_rows, loaded, pending
+            session.commit()
+            total_rows += sum(count for _, _, count in pending)
+            loaded += len(pending)
+            pending = []
+
+        def insert_files(queue):
+            """
+            Insert (symbol, rows) pairs into the open batch.
+
+            A failing file is dropped and counted; its rollback discards the
+            whole uncommitted batch, so the files already in it are queued
+            again and replayed under the same guard.
+            """
+            nonlocal pending, failed
+            while queue:
+                symbol, rows = queue.pop(0)
+                try:
+                    pending.append((symbol, rows, _insert_market_data(session, symbol, rows)))
+                except Exception as e:
+                    session.rollback()
+                    failed += 1
+                    print(f"  {symbol}: ERROR - {e}")
+                    queue = [(s, r) for s, r, _ in pending] + queue
+                    pending = []
+
+        try:
+            with session.no_autoflush:
+                for csv_path in csv_files:
+                    symbol = csv_filename_to_symbol(csv_path.stem)
+                    try:
+                        rows = read_market_data_csv(csv_path, symbol, fetched_at)
+                    except Exception as e:
+                        print(f"  {symbol}: ERROR - {e}")
+                        failed += 1
+                        continue
+                    if not rows:
+                        continue
+
+                    insert_files([(symbol, rows)])
+                    if len(pending) >= commit_every:
+                        commit_pending()
+            commit_pending()
+        finally:
+            # Clear any failed transaction so the PRAGMA restore can run
+            # and the original error is the one that propagates
+            session.rollback()
+            if is_sqlite:
+                conn = session.connection()
+                conn.exec_driver_sql(f'PRAGMA journal_mode={journal_mode}')
+                conn.exec_driver_sql(f'PRAGMA synchronous={synchronous}')
+                session.commit()
+
+    print(f"Market data loaded: {total_rows} rows from {loaded} files ({failed} failed)")
+
+
+def verify_database(app, existing_tables=None):
+    """
+    Verify database is properly initialized.
+
+    Args:
+        app: Flask application instance
+        existing_tables: Table names already read by create_tables; the
+            database catalog is only inspected when this is None
+    """
+    with _app_context(app):
+        tables = existing_tables
+        if tables is None:
+            tables = inspect(get_engine()).get_table_names()
+
+        _report_database(get_scoped_session(), tables)
+
+
+def verify_database_minimal(database_url):
+    """
+    Verify the database straight from its URL, without creating the Flask app.
+
+    Used by --verify-only so diagnostics skip blueprint imports and
+    extension setup.
+
+    Args:
+        database_url: SQLAlchemy database URL
+    """
+    engine = create_engine(database_url)
+    try:
+        tables = inspect(engine).get_table_names()
+        with engine.connect() as conn:
+            _report_database(conn, tables)
+    finally:
+        engine.dispose()
+
+
+def _report_database(executor, tables):
+    """
+    Print table status, record counts and market data coverage.
+
+    Args:
+        executor: Session or Connection used to run the queries
+        tables: Table names present in the database
+    """
+    print("\n" + "="*50)
+    print("Database Verification")
+    print("="*50)
+
+    expected_tables = [
+        'portfolio_state', 'holdings', 'trades_history',
+        'strategy_customizations', 'market_data_cache', 'market_data_metadata'
+    ]
+
+    print("\nTable Status:")
+    for table in expected_tables:
+        status = "OK" if table in tables else "MISSING"
+        print(f"  {table}: {status}")
+
+    # Check record counts in a single query
+    count_models = [
+        ('Portfolios', PortfolioState),
+        ('Holdings', Holdings),
+        ('Trades', TradesHistory),
+        ('Strategy Customizations', StrategyCustomization),
+        ('Market Data Cache', MarketDataCache),
+        ('Market Data Metadata', MarketDataMetadata),
+    ]
+    counts = executor.execute(select(*[
+        select(func.count()).select_from(model).scalar_subquery()
+        for _, model in count_models
+    ])).one()
+
+    print("\nRecord Counts:")
+    for (label, _), count in zip(count_models, counts):
+        print(f"  {label}: {count}")
+
+    # Check market data coverage
+    metadata_count = counts[-1]
+    if metadata_count > 0:
+        print("\nMarket Data Coverage:")
+        coverage = executor.execute(select(
+            MarketDataMetadata.symbol,
+            MarketDataMetadata.total_records,
+            MarketDataMetadata.earliest_date,
+            MarketDataMetadata.latest_date
+        ).order_by(MarketDataMetadata.symbol).limit(10))
+        for meta in coverage:
+            print(f"  {meta.symbol}: {meta.total_records} records "
+                  f"({meta.earliest_date} to {meta.latest_date})")
+
+        remaining = metadata_count - 10
+        if remaining > 0:
+            print(f"  ... and {remaining} more symbols")
 
 
 def main():
@@ -194,11 +469,24 @@ def main():
         action='store_true',
         help='Only verify database, do not create or modify'
     )
+    parser.add_argument(
+        '--load-csv',
+        action='store_true',
+        help='Bulk load scraped CSVs from data/tickercsv into market_data_cache'
+    )
 
     args = parser.parse_args()
 
-    # Create Flask app
     config = get_config()
+
+    # Verification only needs an engine, not the full Flask app
+    if args.verify_only and config.STORAGE_BACKEND != 'csv':
+        database_url = config().SQLALCHEMY_DATABASE_URI
+        print(f"Database: {database_url}")
+        verify_database_minimal(database_url)
+        return
+
+    # Create Flask app
     app = create_app(config)
 
     print("\n" + "="*60)
@@ -207,19 +495,24 @@ def main():
     print(f"Database: {app.config.get('SQLALCHEMY_DATABASE_URI', 'Not configured')}")
     print(f"Environment: {os.getenv('FLASK_ENV', 'development')}")
 
-    if args.verify_only:
-        verify_database(app)
-        return
+    # One app context (and scoped session) for the whole run
+    with app.app_context():
+        if args.verify_only:
+            verify_database(app)
+            return
+
+        # Create tables
+        tables = create_tables(app, drop_existing=args.drop_existing)
 
-    # Create tables
-    create_tables(app, drop_existing=args.drop_existing)
+        # Initialize default data
+        init_default_portfolio(app)
+        init_strategy_customizations(app)
 
-    # Initialize default data
-    init_default_portfolio(app)
-    init_strategy_customizations(app)
+        if args.load_csv:
+            load_market_data_csvs(app)
 
-    # Verify
-    verify_database(app)
+        # Verify (reuse the table list read by create_tables)
+        verify_database(app, existing_tables=tables)
 
     print("\n" + "="*60)
     print("Database initialization complete!")
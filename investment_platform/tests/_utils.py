@@ -0,0 +1,13 @@
+"""
+Shared test helpers.
+"""
+
+
+def is_sorted_asc(xs):
+    """Return True if xs is in non-decreasing order (single linear pass)."""
+    return all(a <= b for a, b in zip(xs, xs[1:]))
+
+
+def is_sorted_desc(xs):
+    """Return True if xs is in non-increasing order (single linear pass)."""
+    return all(a >= b for a, b in zip(xs, xs[1:]))
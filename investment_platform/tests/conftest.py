@@ -3,62 +3,136 @@ Pytest Configuration and Fixtures
 
 Provides shared fixtures for all tests including:
 - Flask test client
-- Database session with automatic cleanup
+- Database session rolled back after each test
 - Mock data generators
 """
-import os
-import sys
+import threading
 import pytest
 from decimal import Decimal
+from functools import lru_cache
+from types import MappingProxyType
 from datetime import datetime, date, timedelta
+from unittest.mock import patch
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import event, insert
+from werkzeug.serving import make_server
 
 from app import create_app
-from app.database import get_scoped_session, create_all, drop_all
+from app.database import get_scoped_session, get_engine, create_all
 from app.config import TestingConfig
+from app.data.stock_universe import STOCK_UNIVERSE
+from app.data.strategies import STRATEGIES, STRATEGY_IDS
+from app.data.symbol_universe import SYMBOL_UNIVERSE
 from app.models import (
     PortfolioState, Holdings, TradesHistory,
     StrategyCustomization, MarketDataCache, MarketDataMetadata
 )
+from app.services.market_data_service import MarketDataService
+
+ONE_DAY = timedelta(days=1)
+
+# Flask apps already built for a config class (see _get_app)
+_APP_CACHE = {}
+
+
+def _get_app(config_class):
+    """Build the Flask app for a config class once per process."""
+    if config_class not in _APP_CACHE:
+        _APP_CACHE[config_class] = create_app(config_class)
+    return _APP_CACHE[config_class]
 
 
 @pytest.fixture(scope='session')
 def app():
     """Create application for testing."""
-    application = create_app(TestingConfig)
+    application = _get_app(TestingConfig)
 
     with application.app_context():
+        _enable_sqlite_savepoints(get_engine())
+        # DDL runs once per test session (per xdist worker); the in-memory
+        # database goes away with the engine, so no drop_all() is needed
         create_all()
         yield application
-        drop_all()
+        get_engine().dispose()
 
 
-@pytest.fixture(scope='function')
+def _enable_sqlite_savepoints(engine):
+    """
+    Make SAVEPOINT/ROLLBACK work on pysqlite.
+
+    pysqlite defers BEGIN until the first DML statement, so a leading
+    SAVEPOINT would open (and its RELEASE would commit) the outer
+    transaction. Disable the driver's transaction handling and emit BEGIN
+    ourselves.
+    """
+    @event.listens_for(engine, 'connect')
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _emit_begin(conn):
+        conn.exec_driver_sql('BEGIN')
+
+
+@pytest.fixture(scope='session')
 def client(app):
-    """Create test client for API testing."""
-    return app.test_client()
+    """Create test client for API testing (shared; the API is cookie-less)."""
+    return app.test_client(use_cookies=False)
+
+
+@pytest.fixture(scope='session')
+def live_server(app):
+    """
+    Serve the app over real HTTP on a background thread; yields the base URL.
+
+    The server handles one request at a time, so server-side database work
+    never interleaves on the shared test connection.
+    """
+    server = make_server('127.0.0.1', 0, app)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    thread.join()
+
+
+@pytest.fixture(scope='session')
+def http_session():
+    """requests session with a connection pool shared by concurrent callers."""
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=8))
+    yield session
+    session.close()
 
 
 @pytest.fixture(scope='function')
 def db_session(app):
-    """Create database session with automatic cleanup."""
+    """
+    Create database session whose changes are rolled back after the test.
+
+    The scoped session is bound to a single connection inside an outer
+    transaction; commits made by tests or app code only release a
+    SAVEPOINT, and teardown rolls the outer transaction back.
+    """
     with app.app_context():
         session = get_scoped_session()
-        # Clear all tables before each test
-        session.query(TradesHistory).delete()
-        session.query(Holdings).delete()
-        session.query(StrategyCustomization).delete()
-        session.query(MarketDataCache).delete()
-        session.query(MarketDataMetadata).delete()
-        session.query(PortfolioState).delete()
-        session.commit()
+        engine = get_engine()
+        connection = engine.connect()
+        transaction = connection.begin()
+
+        session.remove()
+        session.configure(bind=connection, join_transaction_mode='create_savepoint')
 
         yield session
 
-        # Cleanup after test
-        session.rollback()
+        session.remove()
+        session.configure(bind=engine, join_transaction_mode='conservative_savepoint')
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture
@@ -77,90 +151,99 @@ def sample_portfolio(db_session):
     return portfolio
 
 
+@pytest.fixture(scope='session')
+def holding_rows():
+    """Column values for sample_holdings, built once per test session."""
+    return [
+        {
+            'user_id': 'test_user',
+            'symbol': 'AAPL',
+            'name': 'Apple Inc.',
+            'sector': 'Technology',
+            'quantity': Decimal('100'),
+            'avg_cost': Decimal('150.00')
+        },
+        {
+            'user_id': 'test_user',
+            'symbol': 'MSFT',
+            'name': 'Microsoft Corporation',
+            'sector': 'Technology',
+            'quantity': Decimal('50'),
+            'avg_cost': Decimal('300.00')
+        },
+        {
+            'user_id': 'test_user',
+            'symbol': 'JNJ',
+            'name': 'Johnson & Johnson',
+            'sector': 'Healthcare',
+            'quantity': Decimal('75'),
+            'avg_cost': Decimal('160.00')
+        }
+    ]
+
+
 @pytest.fixture
-def sample_holdings(db_session, sample_portfolio):
+def sample_holdings(db_session, sample_portfolio, holding_rows):
     """Create sample holdings for testing."""
-    holdings = [
-        Holdings(
-            user_id='test_user',
-            symbol='AAPL',
-            name='Apple Inc.',
-            sector='Technology',
-            quantity=Decimal('100'),
-            avg_cost=Decimal('150.00')
-        ),
-        Holdings(
-            user_id='test_user',
-            symbol='MSFT',
-            name='Microsoft Corporation',
-            sector='Technology',
-            quantity=Decimal('50'),
-            avg_cost=Decimal('300.00')
-        ),
-        Holdings(
-            user_id='test_user',
-            symbol='JNJ',
-            name='Johnson & Johnson',
-            sector='Healthcare',
-            quantity=Decimal('75'),
-            avg_cost=Decimal('160.00')
-        )
-    ]
-    for holding in holdings:
-        db_session.add(holding)
+    holdings = _bulk_create(db_session, Holdings, holding_rows)
     db_session.commit()
     return holdings
 
 
+@pytest.fixture(scope='session')
+def trade_rows():
+    """Column values for sample_trades, built once per test session."""
+    now = datetime.now()
+    return [
+        {
+            'user_id': 'test_user',
+            'trade_id': 'trade-001',
+            'timestamp': now - timedelta(days=5),
+            'type': 'buy',
+            'symbol': 'AAPL',
+            'stock_name': 'Apple Inc.',
+            'sector': 'Technology',
+            'quantity': 100,
+            'price': Decimal('150.00'),
+            'total': Decimal('15000.00'),
+            'fees': Decimal('15.00'),
+            'strategy': 'monetary_policy'
+        },
+        {
+            'user_id': 'test_user',
+            'trade_id': 'trade-002',
+            'timestamp': now - timedelta(days=3),
+            'type': 'buy',
+            'symbol': 'MSFT',
+            'stock_name': 'Microsoft Corporation',
+            'sector': 'Technology',
+            'quantity': 50,
+            'price': Decimal('300.00'),
+            'total': Decimal('15000.00'),
+            'fees': Decimal('15.00'),
+            'strategy': 'monetary_policy'
+        },
+        {
+            'user_id': 'test_user',
+            'trade_id': 'trade-003',
+            'timestamp': now - timedelta(days=1),
+            'type': 'sell',
+            'symbol': 'AAPL',
+            'stock_name': 'Apple Inc.',
+            'sector': 'Technology',
+            'quantity': 20,
+            'price': Decimal('155.00'),
+            'total': Decimal('3100.00'),
+            'fees': Decimal('3.10'),
+            'strategy': 'monetary_policy'
+        }
+    ]
+
+
 @pytest.fixture
-def sample_trades(db_session, sample_portfolio):
+def sample_trades(db_session, sample_portfolio, trade_rows):
     """Create sample trade history for testing."""
-    trades = [
-        TradesHistory(
-            user_id='test_user',
-            trade_id='trade-001',
-            timestamp=datetime.now() - timedelta(days=5),
-            type='buy',
-            symbol='AAPL',
-            stock_name='Apple Inc.',
-            sector='Technology',
-            quantity=100,
-            price=Decimal('150.00'),
-            total=Decimal('15000.00'),
-            fees=Decimal('15.00'),
-            strategy='monetary_policy'
-        ),
-        TradesHistory(
-            user_id='test_user',
-            trade_id='trade-002',
-            timestamp=datetime.now() - timedelta(days=3),
-            type='buy',
-            symbol='MSFT',
-            stock_name='Microsoft Corporation',
-            sector='Technology',
-            quantity=50,
-            price=Decimal('300.00'),
-            total=Decimal('15000.00'),
-            fees=Decimal('15.00'),
-            strategy='monetary_policy'
-        ),
-        TradesHistory(
-            user_id='test_user',
-            trade_id='trade-003',
-            timestamp=datetime.now() - timedelta(days=1),
-            type='sell',
-            symbol='AAPL',
-            stock_name='Apple Inc.',
-            sector='Technology',
-            quantity=20,
-            price=Decimal('155.00'),
-            total=Decimal('3100.00'),
-            fees=Decimal('3.10'),
-            strategy='monetary_policy'
-        )
-    ]
-    for trade in trades:
-        db_session.add(trade)
+    trades = _bulk_create(db_session, TradesHistory, trade_rows)
     db_session.commit()
     return trades
 
@@ -184,38 +267,52 @@ def sample_strategy_customization(db_session, sample_portfolio):
     return customization
 
 
-@pytest.fixture
-def sample_market_data(db_session):
-    """Create sample market data cache for testing."""
-    base_date = date.today() - timedelta(days=30)
-    cache_entries = []
+@pytest.fixture(scope='session')
+def market_data_rows():
+    """Column values for sample_market_data, built once per test session."""
+    today = date.today()
+    base_date = today - timedelta(days=30)
+    base_open, base_high = Decimal('150.00'), Decimal('152.00')
+    base_low, base_close = Decimal('148.00'), Decimal('151.00')
+    half = Decimal('0.5')
+    fetched_at = datetime.now()
+    rows = []
 
     for i in range(30):
-        current_date = base_date + timedelta(days=i)
+        current_date = base_date + i * ONE_DAY
         # Skip weekends
         if current_date.weekday() >= 5:
             continue
 
-        entry = MarketDataCache(
-            symbol='AAPL',
-            date=current_date,
-            open=Decimal('150.00') + Decimal(str(i * 0.5)),
-            high=Decimal('152.00') + Decimal(str(i * 0.5)),
-            low=Decimal('148.00') + Decimal(str(i * 0.5)),
-            close=Decimal('151.00') + Decimal(str(i * 0.5)),
-            adj_close=Decimal('151.00') + Decimal(str(i * 0.5)),
-            volume=1000000 + i * 10000,
-            fetched_at=datetime.now()
-        )
-        cache_entries.append(entry)
-        db_session.add(entry)
+        offset = i * half
+        close = base_close + offset
+        rows.append({
+            'symbol': 'AAPL',
+            'date': current_date,
+            'open': base_open + offset,
+            'high': base_high + offset,
+            'low': base_low + offset,
+            'close': close,
+            'adj_close': close,
+            'volume': 1000000 + i * 10000,
+            'fetched_at': fetched_at
+        })
+
+    return rows
+
+
+@pytest.fixture
+def sample_market_data(db_session, market_data_rows):
+    """Create sample market data cache for testing."""
+    today = date.today()
+    cache_entries = _bulk_create(db_session, MarketDataCache, market_data_rows)
 
     # Add metadata
     metadata = MarketDataMetadata(
         symbol='AAPL',
-        last_fetch_date=date.today(),
-        earliest_date=base_date,
-        latest_date=date.today() - timedelta(days=1),
+        last_fetch_date=today,
+        earliest_date=today - timedelta(days=30),
+        latest_date=today - ONE_DAY,
         total_records=len(cache_entries),
         fetch_status='complete'
     )
@@ -225,10 +322,10 @@ def sample_market_data(db_session):
     return cache_entries
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def current_prices():
-    """Return mock current prices for testing."""
-    return {
+    """Return mock current prices for testing (shared, read-only)."""
+    return MappingProxyType({
         'AAPL': Decimal('155.00'),
         'MSFT': Decimal('310.00'),
         'GOOGL': Decimal('140.00'),
@@ -239,11 +336,103 @@ def current_prices():
         'BAC': Decimal('35.00'),
         'COIN': Decimal('250.00'),
         'TSLA': Decimal('245.00')
-    }
+    })
+
+
+@pytest.fixture(scope='session')
+def stock_universe():
+    """Deeply read-only copy of the stock universe, shared across the session."""
+    return _deep_freeze(STOCK_UNIVERSE)
+
+
+@pytest.fixture(scope='session')
+def symbol_universe():
+    """Deeply read-only copy of the macro symbol universe, shared across the session."""
+    return _deep_freeze(SYMBOL_UNIVERSE)
+
+
+@pytest.fixture(scope='session')
+def strategies():
+    """Deeply read-only copy of the macro strategy definitions, shared across the session."""
+    return _deep_freeze(STRATEGIES)
+
+
+@pytest.fixture(scope='session')
+def strategy_ids():
+    """Macro strategy ids in display order."""
+    return tuple(STRATEGY_IDS)
+
+
+@pytest.fixture(scope='session')
+def now_iso():
+    """Return a fixed ISO timestamp for request payloads."""
+    return datetime(2024, 1, 1, 12, 0, 0).isoformat()
+
+
+@pytest.fixture
+def mock_yahoo_finance():
+    """Serve generated price history in place of downloaded/local CSV data."""
+    end_date = date.today()
+    start_date = end_date - timedelta(days=365)
+
+    def load(service, symbol):
+        return create_mock_data(symbol.upper(), start_date, end_date).copy()
+
+    with patch.object(MarketDataService, '_load_from_local_csv', load):
+        yield create_mock_data
 
 
 # Helper functions for tests
 
+@lru_cache(maxsize=None)
+def create_mock_data(symbol, start_date, end_date):
+    """
+    Generate deterministic daily OHLCV data for a symbol.
+
+    Draws one seeded block of normals and slices it into the price and
+    volume columns. Results are cached per (symbol, start_date, end_date);
+    callers that modify the frame must copy it first.
+    """
+    dates = pd.bdate_range(start_date, end_date).date
+    block = np.random.default_rng(42).standard_normal((len(dates), 5))
+
+    close = 100 + np.cumsum(block[:, 0])
+    open_ = close + block[:, 1] * 0.5
+    return pd.DataFrame(
+        {
+            'open': open_,
+            'high': np.maximum(open_, close) + np.abs(block[:, 2]),
+            'low': np.minimum(open_, close) - np.abs(block[:, 3]),
+            'close': close,
+            'adj_close': close,
+            'volume': (1000000 + np.abs(block[:, 4]) * 500000).astype(np.int64),
+        },
+        index=pd.Index(dates, name='date')
+    )
+
+
+def _deep_freeze(value):
+    """
+    Return a read-only copy of nested data definitions.
+
+    Dicts become MappingProxyType views and lists become tuples, so a test
+    cannot mutate data shared through a session-scoped fixture.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({k: _deep_freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_deep_freeze(v) for v in value)
+    return value
+
+
+def _bulk_create(db_session, model, rows):
+    """Insert rows in one multi-row INSERT and return the ORM objects in order."""
+    return db_session.scalars(
+        insert(model).returning(model, sort_by_parameter_order=True),
+        rows
+    ).all()
+
+
 def create_test_portfolio(db_session, user_id='test_user', cash=Decimal('100000')):
     """Helper to create a test portfolio."""
     portfolio = PortfolioState(
@@ -267,7 +456,7 @@ def create_test_holding(db_session, user_id='test_user', symbol='AAPL',
         symbol=symbol,
         name=f'{symbol} Inc.',
         sector='Technology',
-        quantity=Decimal(str(quantity)),
+        quantity=Decimal(quantity),
         avg_cost=avg_cost
     )
     db_session.add(holding)
@@ -10,9 +10,23 @@ Tests all REST API endpoints including:
 - Health endpoints
 """
 import pytest
-import json
-from decimal import Decimal
-from datetime import datetime, date, timedelta
+from datetime import date, timedelta
+
+from tests._utils import is_sorted_asc, is_sorted_desc
+
+# Endpoint paths and the default test user's query, built once at import
+USER_QS = {'user_id': 'test_user'}
+PORTFOLIO_SETTINGS = '/api/portfolio/settings'
+PORTFOLIO_CASH = '/api/portfolio/cash'
+PORTFOLIO_RESET = '/api/portfolio/reset'
+CUSTOMIZATIONS = '/api/strategies/customizations'
+CUSTOMIZATIONS_GROWTH = '/api/strategies/customizations/growth'
+CUSTOMIZATIONS_AGGRESSIVE = '/api/strategies/customizations/aggressive'
+CUSTOMIZATIONS_BALANCED = '/api/strategies/customizations/balanced'
+TRADES = '/api/trades'
+HOLDINGS = '/api/holdings'
+TRADING_AUTO = '/api/trading/auto'
+TRADING_STATUS = '/api/trading/status'
 
 
 class TestHealthEndpoint:
@@ -40,7 +54,7 @@ class TestPortfolioEndpoints:
 
     def test_get_portfolio_settings(self, client, sample_portfolio):
         """GET /api/portfolio/settings returns portfolio data."""
-        response = client.get('/api/portfolio/settings?user_id=test_user')
+        response = client.get(PORTFOLIO_SETTINGS, query_string=USER_QS)
 
         assert response.status_code == 200
         data = response.get_json()
@@ -52,12 +66,13 @@ class TestPortfolioEndpoints:
         """GET /api/portfolio/settings creates default user if none exists."""
         response = client.get('/api/portfolio/settings')
 
-        assert response.status_code in [200, 201]
+        assert response.status_code in {200, 201}
 
     def test_update_portfolio_settings(self, client, sample_portfolio):
         """PUT /api/portfolio/settings updates settings."""
         response = client.put(
-            '/api/portfolio/settings?user_id=test_user',
+            PORTFOLIO_SETTINGS,
+            query_string=USER_QS,
             json={'current_strategy': 'growth'}
         )
 
@@ -68,7 +83,8 @@ class TestPortfolioEndpoints:
     def test_update_portfolio_cash(self, client, sample_portfolio):
         """PUT /api/portfolio/cash updates cash balance."""
         response = client.put(
-            '/api/portfolio/cash?user_id=test_user',
+            PORTFOLIO_CASH,
+            query_string=USER_QS,
             json={'current_cash': 75000.00}
         )
 
@@ -78,32 +94,23 @@ class TestPortfolioEndpoints:
 
     def test_reset_portfolio(self, client, sample_portfolio, sample_holdings, sample_trades):
         """POST /api/portfolio/reset clears all data."""
-        response = client.post('/api/portfolio/reset?user_id=test_user')
+        response = client.post(PORTFOLIO_RESET, query_string=USER_QS)
 
         assert response.status_code == 200
 
         # Verify reset
-        get_response = client.get('/api/portfolio/settings?user_id=test_user')
+        get_response = client.get(PORTFOLIO_SETTINGS, query_string=USER_QS)
         data = get_response.get_json()
         assert float(data['current_cash']) == float(data['initial_value'])
         assert float(data['realized_gains']) == 0
 
-    def test_update_invalid_strategy(self, client, sample_portfolio):
-        """PUT with invalid strategy should fail."""
-        response = client.put(
-            '/api/portfolio/settings?user_id=test_user',
-            json={'current_strategy': 'invalid_strategy'}
-        )
-
-        assert response.status_code == 400
-
 
 class TestStrategyEndpoints:
     """Tests for strategy API endpoints."""
 
     def test_get_strategy_customizations(self, client, sample_strategy_customization):
         """GET /api/strategies/customizations returns customizations."""
-        response = client.get('/api/strategies/customizations?user_id=test_user')
+        response = client.get(CUSTOMIZATIONS, query_string=USER_QS)
 
         assert response.status_code == 200
         data = response.get_json()
@@ -112,7 +119,8 @@ class TestStrategyEndpoints:
     def test_update_strategy_customization(self, client, sample_portfolio):
         """PUT /api/strategies/customizations/<id> updates customization."""
         response = client.put(
-            '/api/strategies/customizations/growth?user_id=test_user',
+            CUSTOMIZATIONS_GROWTH,
+            query_string=USER_QS,
             json={
                 'confidence_level': 80,
                 'trade_frequency': 'high',
@@ -127,53 +135,28 @@ class TestStrategyEndpoints:
     def test_create_strategy_customization(self, client, sample_portfolio):
         """PUT creates new customization if none exists."""
         response = client.put(
-            '/api/strategies/customizations/aggressive?user_id=test_user',
+            CUSTOMIZATIONS_AGGRESSIVE,
+            query_string=USER_QS,
             json={
                 'confidence_level': 90,
                 'trade_frequency': 'high'
             }
         )
 
-        assert response.status_code in [200, 201]
-
-    def test_invalid_confidence_level(self, client, sample_portfolio):
-        """Confidence level must be 10-100."""
-        response = client.put(
-            '/api/strategies/customizations/balanced?user_id=test_user',
-            json={'confidence_level': 150}
-        )
-
-        assert response.status_code == 400
-
-    def test_invalid_trade_frequency(self, client, sample_portfolio):
-        """Trade frequency must be low/medium/high."""
-        response = client.put(
-            '/api/strategies/customizations/balanced?user_id=test_user',
-            json={'trade_frequency': 'ultra_fast'}
-        )
-
-        assert response.status_code == 400
-
-    def test_invalid_max_position_size(self, client, sample_portfolio):
-        """Max position size must be 5-50."""
-        response = client.put(
-            '/api/strategies/customizations/balanced?user_id=test_user',
-            json={'max_position_size': 75}
-        )
-
-        assert response.status_code == 400
+        assert response.status_code in {200, 201}
 
 
 class TestTradeEndpoints:
     """Tests for trade API endpoints."""
 
-    def test_create_trade(self, client, sample_portfolio):
+    def test_create_trade(self, client, sample_portfolio, now_iso):
         """POST /api/trades creates new trade."""
         response = client.post(
-            '/api/trades?user_id=test_user',
+            TRADES,
+            query_string=USER_QS,
             json={
                 'trade_id': 'test-trade-new',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now_iso,
                 'type': 'buy',
                 'symbol': 'AAPL',
                 'stock_name': 'Apple Inc.',
@@ -192,7 +175,7 @@ class TestTradeEndpoints:
 
     def test_get_trades(self, client, sample_trades):
         """GET /api/trades returns trade history."""
-        response = client.get('/api/trades?user_id=test_user')
+        response = client.get(TRADES, query_string=USER_QS)
 
         assert response.status_code == 200
         data = response.get_json()
@@ -201,42 +184,30 @@ class TestTradeEndpoints:
 
     def test_get_trades_ordered_by_timestamp(self, client, sample_trades):
         """Trades should be ordered by timestamp DESC."""
-        response = client.get('/api/trades?user_id=test_user')
+        response = client.get(TRADES, query_string=USER_QS)
 
         data = response.get_json()
         timestamps = [t['timestamp'] for t in data]
 
         # Should be descending order
-        assert timestamps == sorted(timestamps, reverse=True)
+        assert is_sorted_desc(timestamps)
 
     def test_get_trades_limit(self, client, sample_trades):
         """Trades endpoint respects limit parameter."""
-        response = client.get('/api/trades?user_id=test_user&limit=2')
+        response = client.get(TRADES, query_string={**USER_QS, 'limit': 2})
 
         data = response.get_json()
         assert len(data) <= 2
 
-    def test_create_trade_missing_fields(self, client, sample_portfolio):
-        """POST with missing required fields should fail."""
-        response = client.post(
-            '/api/trades?user_id=test_user',
-            json={
-                'trade_id': 'test-incomplete',
-                'type': 'buy'
-                # Missing: symbol, quantity, price, total
-            }
-        )
-
-        assert response.status_code == 400
-
-    def test_create_trade_invalid_type(self, client, sample_portfolio):
-        """Trade type must be buy or sell."""
+    def test_duplicate_trade_id_fails(self, client, sample_trades, now_iso):
+        """Duplicate trade_id should fail."""
         response = client.post(
-            '/api/trades?user_id=test_user',
+            TRADES,
+            query_string=USER_QS,
             json={
-                'trade_id': 'test-invalid-type',
-                'timestamp': datetime.now().isoformat(),
-                'type': 'hold',
+                'trade_id': 'trade-001',  # Already exists
+                'timestamp': now_iso,
+                'type': 'buy',
                 'symbol': 'AAPL',
                 'quantity': 10,
                 'price': 150.00,
@@ -244,24 +215,58 @@ class TestTradeEndpoints:
             }
         )
 
-        assert response.status_code == 400
-
-    def test_duplicate_trade_id_fails(self, client, sample_trades):
-        """Duplicate trade_id should fail."""
-        response = client.post(
-            '/api/trades?user_id=test_user',
-            json={
-                'trade_id': 'trade-001',  # Already exists
-                'timestamp': datetime.now().isoformat(),
-                'type': 'buy',
+        assert response.status_code in {400, 409}
+
+
+class TestValidationErrors:
+    """Tests for request validation across endpoints."""
+
+    @pytest.mark.parametrize('method,endpoint,payload', [
+        pytest.param(
+            'put', PORTFOLIO_SETTINGS,
+            {'current_strategy': 'invalid_strategy'},
+            id='invalid_strategy'
+        ),
+        pytest.param(
+            'put', CUSTOMIZATIONS_BALANCED,
+            {'confidence_level': 150},  # Must be 10-100
+            id='invalid_confidence_level'
+        ),
+        pytest.param(
+            'put', CUSTOMIZATIONS_BALANCED,
+            {'trade_frequency': 'ultra_fast'},  # Must be low/medium/high
+            id='invalid_trade_frequency'
+        ),
+        pytest.param(
+            'put', CUSTOMIZATIONS_BALANCED,
+            {'max_position_size': 75},  # Must be 5-50
+            id='invalid_max_position_size'
+        ),
+        pytest.param(
+            'post', TRADES,
+            # Missing: symbol, quantity, price, total
+            {'trade_id': 'test-incomplete', 'type': 'buy'},
+            id='trade_missing_fields'
+        ),
+        pytest.param(
+            'post', TRADES,
+            {
+                'trade_id': 'test-invalid-type',
+                'timestamp': '2024-01-01T12:00:00',
+                'type': 'hold',  # Must be buy or sell
                 'symbol': 'AAPL',
                 'quantity': 10,
                 'price': 150.00,
                 'total': 1500.00
-            }
-        )
+            },
+            id='trade_invalid_type'
+        ),
+    ])
+    def test_validation_errors(self, client, sample_portfolio, method, endpoint, payload):
+        """Invalid payloads should be rejected with 400."""
+        response = getattr(client, method)(endpoint, query_string=USER_QS, json=payload)
 
-        assert response.status_code in [400, 409]
+        assert response.status_code == 400
 
 
 class TestHoldingsEndpoints:
@@ -269,7 +274,7 @@ class TestHoldingsEndpoints:
 
     def test_get_holdings(self, client, sample_holdings):
         """GET /api/holdings returns current holdings."""
-        response = client.get('/api/holdings?user_id=test_user')
+        response = client.get(HOLDINGS, query_string=USER_QS)
 
         assert response.status_code == 200
         data = response.get_json()
@@ -278,12 +283,12 @@ class TestHoldingsEndpoints:
 
     def test_get_holdings_ordered_by_symbol(self, client, sample_holdings):
         """Holdings should be ordered by symbol."""
-        response = client.get('/api/holdings?user_id=test_user')
+        response = client.get(HOLDINGS, query_string=USER_QS)
 
         data = response.get_json()
         symbols = [h['symbol'] for h in data]
 
-        assert symbols == sorted(symbols)
+        assert is_sorted_asc(symbols)
 
     def test_update_holdings_bulk(self, client, sample_portfolio):
         """PUT /api/holdings replaces all holdings."""
@@ -305,14 +310,15 @@ class TestHoldingsEndpoints:
         ]
 
         response = client.put(
-            '/api/holdings?user_id=test_user',
+            HOLDINGS,
+            query_string=USER_QS,
             json=new_holdings
         )
 
         assert response.status_code == 200
 
         # Verify replacement
-        get_response = client.get('/api/holdings?user_id=test_user')
+        get_response = client.get(HOLDINGS, query_string=USER_QS)
         data = get_response.get_json()
         symbols = [h['symbol'] for h in data]
         assert 'TSLA' in symbols
@@ -321,13 +327,14 @@ class TestHoldingsEndpoints:
     def test_update_holdings_empty(self, client, sample_holdings):
         """PUT with empty array clears holdings."""
         response = client.put(
-            '/api/holdings?user_id=test_user',
+            HOLDINGS,
+            query_string=USER_QS,
             json=[]
         )
 
         assert response.status_code == 200
 
-        get_response = client.get('/api/holdings?user_id=test_user')
+        get_response = client.get(HOLDINGS, query_string=USER_QS)
         data = get_response.get_json()
         assert len(data) == 0
 
@@ -335,6 +342,13 @@ class TestHoldingsEndpoints:
 class TestMarketDataEndpoints:
     """Tests for market data API endpoints."""
 
+    # Last 30 days of history, formatted once at import
+    HISTORY_URL = (
+        f'/api/market/history/AAPL?'
+        f'start_date={(date.today() - timedelta(days=30)).isoformat()}&'
+        f'end_date={date.today().isoformat()}'
+    )
+
     def test_get_price(self, client, sample_market_data):
         """GET /api/market/price/<symbol> returns current price."""
         response = client.get('/api/market/price/AAPL')
@@ -345,19 +359,9 @@ class TestMarketDataEndpoints:
         assert 'price' in data
         assert data['symbol'] == 'AAPL'
 
-    def test_get_price_invalid_symbol(self, client):
-        """Invalid symbol returns 404."""
-        response = client.get('/api/market/price/INVALID123')
-
-        assert response.status_code in [404, 400]
-
     def test_get_price_history(self, client, sample_market_data):
         """GET /api/market/history/<symbol> returns OHLCV data."""
-        response = client.get(
-            f'/api/market/history/AAPL?'
-            f'start_date={(date.today() - timedelta(days=30)).isoformat()}&'
-            f'end_date={date.today().isoformat()}'
-        )
+        response = client.get(self.HISTORY_URL)
 
         assert response.status_code == 200
         data = response.get_json()
@@ -386,7 +390,7 @@ class TestMarketDataEndpoints:
             json={'symbols': ['AAPL']}
         )
 
-        assert response.status_code in [200, 202]
+        assert response.status_code in {200, 202}
 
     def test_clear_cache(self, client, sample_market_data):
         """DELETE /api/market/cache/<symbol> clears cache."""
@@ -401,29 +405,33 @@ class TestErrorHandling:
     def test_invalid_json(self, client, sample_portfolio):
         """Invalid JSON should return 400."""
         response = client.post(
-            '/api/trades?user_id=test_user',
+            TRADES,
+            query_string=USER_QS,
             data='not valid json',
             content_type='application/json'
         )
 
         assert response.status_code == 400
 
-    def test_method_not_allowed(self, client):
-        """Wrong HTTP method should return 405."""
-        response = client.delete('/api/portfolio/settings')
+    @pytest.mark.parametrize('method,url,expected', [
+        pytest.param('delete', '/api/portfolio/settings', frozenset({405}),
+                     id='method_not_allowed'),
+        pytest.param('get', '/api/nonexistent', frozenset({404}),
+                     id='not_found'),
+        pytest.param('get', '/api/market/price/INVALID123', frozenset({400, 404}),
+                     id='invalid_symbol'),
+    ])
+    def test_http_error_codes(self, client, method, url, expected):
+        """Unknown routes, wrong methods and unknown symbols return 4xx."""
+        response = getattr(client, method)(url)
 
-        assert response.status_code == 405
-
-    def test_not_found(self, client):
-        """Non-existent endpoint should return 404."""
-        response = client.get('/api/nonexistent')
-
-        assert response.status_code == 404
+        assert response.status_code in expected
 
     def test_error_response_format(self, client, sample_portfolio):
         """Error responses should have consistent format."""
         response = client.put(
-            '/api/strategies/customizations/balanced?user_id=test_user',
+            CUSTOMIZATIONS_BALANCED,
+            query_string=USER_QS,
             json={'confidence_level': 999}
         )
 
@@ -435,28 +443,22 @@ class TestErrorHandling:
 class TestConcurrentRequests:
     """Tests for concurrent request handling."""
 
-    def test_concurrent_reads(self, client, sample_portfolio, sample_holdings):
+    def test_concurrent_reads(self, live_server, http_session, sample_portfolio, sample_holdings):
         """Multiple concurrent reads should succeed."""
         import concurrent.futures
 
-        def fetch_portfolio():
-            return client.get('/api/portfolio/settings?user_id=test_user')
+        portfolio_url = live_server + PORTFOLIO_SETTINGS
+        holdings_url = live_server + HOLDINGS
+        urls = [portfolio_url, holdings_url, portfolio_url, holdings_url]
 
-        def fetch_holdings():
-            return client.get('/api/holdings?user_id=test_user')
+        def fetch(url):
+            return http_session.get(url, params=USER_QS)
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            futures = [
-                executor.submit(fetch_portfolio),
-                executor.submit(fetch_holdings),
-                executor.submit(fetch_portfolio),
-                executor.submit(fetch_holdings),
-            ]
-
-            results = [f.result() for f in futures]
+            results = list(executor.map(fetch, urls))
 
-            for result in results:
-                assert result.status_code == 200
+        for result in results:
+            assert result.status_code == 200
 
 
 class TestTradingEndpoints:
@@ -465,15 +467,16 @@ class TestTradingEndpoints:
     def test_execute_auto_trade(self, client, sample_portfolio, sample_holdings):
         """POST /api/trading/auto executes auto trade."""
         response = client.post(
-            '/api/trading/auto?user_id=test_user',
+            TRADING_AUTO,
+            query_string=USER_QS,
             json={'prices': {'AAPL': 155.00, 'MSFT': 310.00, 'JNJ': 165.00}}
         )
 
-        assert response.status_code in [200, 201]
+        assert response.status_code in {200, 201}
 
     def test_get_trading_status(self, client, sample_portfolio):
         """GET /api/trading/status returns trading status."""
-        response = client.get('/api/trading/status?user_id=test_user')
+        response = client.get(TRADING_STATUS, query_string=USER_QS)
 
         assert response.status_code == 200
         data = response.get_json()
@@ -3,49 +3,154 @@ Unit Tests for Data Definitions
 
 Tests stock universe, symbol universe, and macro strategy definitions.
 """
+import operator
+import re
+from functools import cache
+from math import fsum
+
 import pytest
 
 from app.data.stock_universe import STOCK_UNIVERSE, get_stock_info, get_stocks_by_sector
 from app.data.strategies import (
-    STRATEGIES, STRATEGY_IDS, get_strategy, get_strategy_stocks,
+    STRATEGIES, get_strategy, get_strategy_stocks,
     get_strategy_risk_level, get_strategy_volatility
 )
 from app.data.symbol_universe import (
-    SYMBOL_UNIVERSE, SECTOR_METADATA, get_symbols_by_path,
+    SYMBOL_UNIVERSE, SECTOR_METADATA, get_all_symbols, get_symbols_by_path,
     get_all_sectors, get_sector_for_symbol
 )
 
+pytestmark = pytest.mark.data
+
+STOCK_ITEMS = list(STOCK_UNIVERSE.items())
+STRATEGY_ITEMS = list(STRATEGIES.items())
+SECTOR_ITEMS = list(SYMBOL_UNIVERSE.items())
+
+# Sector paths repeat across strategies; resolve each one once
+_cached_get = cache(get_symbols_by_path)
+
+# fsum rounds weight totals once, so any drift past this is a real mis-specification
+WEIGHT_TOLERANCE = 1e-9
+
+_HEX_RE = re.compile(r'#[0-9A-Fa-f]{6}')
+
+SAFE_SECTORS = frozenset({'utilities', 'consumer_staples', 'healthcare'})
+COMMODITY_SECTORS = frozenset({'energy', 'materials', 'futures'})
+
+STOCK_REQUIRED_FIELDS = frozenset({'name', 'sector', 'base_price', 'beta'})
+STRATEGY_REQUIRED_FIELDS = frozenset({
+    'id', 'name', 'description', 'risk_level', 'expected_return',
+    'color', 'volatility', 'daily_drift', 'trade_frequency_seconds',
+    'target_investment_ratio', 'max_position_pct', 'stocks'
+})
+SIGNAL_REQUIRED_FIELDS = frozenset({'series', 'weight'})
+SECTOR_METADATA_REQUIRED_FIELDS = frozenset({'name', 'color'})
+
+EXPECTED_STOCKS = frozenset({'AAPL', 'MSFT', 'GOOGL', 'AMZN'})
+EXPECTED_SECTORS = frozenset({
+    'financials', 'energy', 'materials', 'technology',
+    'utilities', 'healthcare', 'consumer_staples',
+    'consumer_discretionary', 'industrials', 'real_estate',
+    'futures', 'currency'
+})
+EXPECTED_STRATEGY_IDS = (
+    'monetary_policy', 'inflation_hedge', 'growth_expansion',
+    'defensive_quality', 'liquidity_cycle'
+)
+EXPECTED_STRATEGIES = frozenset(EXPECTED_STRATEGY_IDS)
+
+
+@pytest.fixture(scope='session')
+def stocks_by_sector(stock_universe):
+    """Stock universe items grouped by sector, built in one pass."""
+    index = {}
+    for symbol, stock in stock_universe.items():
+        index.setdefault(stock['sector'], []).append((symbol, stock))
+    return index
+
+
+@pytest.fixture(scope='session')
+def symbol_index(symbol_universe):
+    """
+    Reverse index of symbol -> (sector, subsector), built once.
+
+    A few symbols sit in more than one subsector; like
+    get_sector_for_symbol, the first occurrence wins.
+    """
+    index = {}
+    for sector, subsectors in symbol_universe.items():
+        for subsector, symbols in subsectors.items():
+            for symbol in symbols:
+                index.setdefault(symbol, (sector, subsector))
+    return index
+
+
+@pytest.fixture(scope='session')
+def strategy_stats(strategies):
+    """Per-strategy allocation totals and per-sector weights, computed once."""
+    stats = {}
+    for strategy_id, strategy in strategies.items():
+        allocation = strategy.get('sector_allocation', {})
+        sector_weights = {}
+        for path, weight in allocation.items():
+            sector = path.split('.')[0]
+            sector_weights[sector] = sector_weights.get(sector, 0) + weight
+
+        stats[strategy_id] = {
+            'allocation_total': fsum(allocation.values()),
+            'sector_weights': sector_weights,
+        }
+    return stats
+
+
+@pytest.fixture(scope='session')
+def signal_index(strategies):
+    """
+    Flattened signal configs, built once.
+
+    Returns (triples, weight_sums): a list of (strategy_id, signal_name,
+    config) and each strategy's total signal weight.
+    """
+    triples = [
+        (strategy_id, signal_name, config)
+        for strategy_id, strategy in strategies.items()
+        for signal_name, config in strategy.get('signals', {}).items()
+    ]
+    weights = {strategy_id: [] for strategy_id in strategies}
+    for strategy_id, _, config in triples:
+        weights[strategy_id].append(config.get('weight', 0))
+    weight_sums = {strategy_id: fsum(w) for strategy_id, w in weights.items()}
+    return triples, weight_sums
+
+
+@pytest.fixture(scope='session')
+def strategy_stocks(strategy_ids):
+    """get_strategy_stocks() result for each strategy, resolved once."""
+    return {
+        strategy_id: get_strategy_stocks(strategy_id)
+        for strategy_id in strategy_ids
+    }
+
 
 class TestStockUniverse:
     """Tests for stock universe definitions (legacy display metadata)."""
 
-    def test_stock_universe_not_empty(self):
+    def test_stock_universe_not_empty(self, stock_universe):
         """Stock universe should have entries."""
-        assert len(STOCK_UNIVERSE) > 0
-
-    def test_stock_has_required_fields(self):
-        """Each stock should have required fields."""
-        required_fields = ['name', 'sector', 'base_price', 'beta']
+        assert len(stock_universe) > 0
 
-        for symbol, stock in STOCK_UNIVERSE.items():
-            for field in required_fields:
-                assert field in stock, f"{symbol} missing field: {field}"
+    @pytest.mark.parametrize(
+        'symbol,stock', STOCK_ITEMS, ids=[symbol for symbol, _ in STOCK_ITEMS]
+    )
+    def test_stock_invariants(self, symbol, stock):
+        """Each stock should have required fields, valid symbol, price, beta and sector."""
+        missing = STOCK_REQUIRED_FIELDS - stock.keys()
+        assert not missing, f"{symbol} missing fields: {sorted(missing)}"
 
-    def test_stock_symbols_uppercase(self):
-        """All stock symbols should be uppercase."""
-        for symbol in STOCK_UNIVERSE.keys():
-            assert symbol == symbol.upper(), f"Symbol not uppercase: {symbol}"
-
-    def test_stock_base_prices_positive(self):
-        """All base prices should be positive."""
-        for symbol, stock in STOCK_UNIVERSE.items():
-            assert stock['base_price'] > 0, f"{symbol} has non-positive base price"
-
-    def test_stock_betas_valid(self):
-        """Beta values should be reasonable (0.1 to 3.5)."""
-        for symbol, stock in STOCK_UNIVERSE.items():
-            beta = stock['beta']
-            assert 0.1 <= beta <= 3.5, f"{symbol} has unusual beta: {beta}"
+        assert symbol.isupper(), f"Symbol not uppercase: {symbol}"
+        assert stock['base_price'] > 0, f"{symbol} has non-positive base price"
+        assert 0.1 <= stock['beta'] <= 3.5, f"{symbol} has unusual beta: {stock['beta']}"
+        assert isinstance(stock['sector'], str)
 
     def test_get_stock_exists(self):
         """get_stock_info should return stock data for valid symbol."""
@@ -58,131 +163,118 @@ class TestStockUniverse:
         stock = get_stock_info('INVALID')
         assert stock is None
 
-    def test_get_stocks_by_sector(self):
+    def test_get_stocks_by_sector(self, stocks_by_sector):
         """Should return stocks in specified sector."""
         tech_stocks = get_stocks_by_sector('Technology')
-        assert len(tech_stocks) > 0
-        for symbol, stock in tech_stocks:
-            assert stock['sector'] == 'Technology'
-
-    def test_sectors_are_strings(self):
-        """All sectors should be strings."""
-        for symbol, stock in STOCK_UNIVERSE.items():
-            assert isinstance(stock['sector'], str)
+        assert tech_stocks
+        assert tech_stocks == stocks_by_sector['Technology']
+
+    def test_get_stocks_by_sector_matches_index(self, stocks_by_sector):
+        """get_stocks_by_sector should agree with the prebuilt index for every sector."""
+        wrong = [
+            sector for sector, items in stocks_by_sector.items()
+            if get_stocks_by_sector(sector) != items
+        ]
+        assert not wrong, f"get_stocks_by_sector disagrees for: {wrong}"
 
-    def test_expected_stocks_present(self):
+    def test_expected_stocks_present(self, stock_universe):
         """Expected major stocks should be in universe."""
-        expected = ['AAPL', 'MSFT', 'GOOGL', 'AMZN']
-        for symbol in expected:
-            assert symbol in STOCK_UNIVERSE, f"Missing expected stock: {symbol}"
+        missing = EXPECTED_STOCKS - stock_universe.keys()
+        assert not missing, f"Missing expected stocks: {sorted(missing)}"
 
 
 class TestSymbolUniverse:
     """Tests for the new symbol universe (macro strategy sectors)."""
 
-    def test_symbol_universe_has_sectors(self):
+    def test_symbol_universe_has_sectors(self, symbol_universe):
         """Symbol universe should have multiple sectors."""
-        assert len(SYMBOL_UNIVERSE) >= 10
+        assert len(symbol_universe) >= 10
 
-    def test_expected_sectors_present(self):
+    def test_expected_sectors_present(self, symbol_universe):
         """Expected macro sectors should be defined."""
-        expected_sectors = [
-            'financials', 'energy', 'materials', 'technology',
-            'utilities', 'healthcare', 'consumer_staples',
-            'consumer_discretionary', 'industrials', 'real_estate',
-            'futures', 'currency'
-        ]
-        for sector in expected_sectors:
-            assert sector in SYMBOL_UNIVERSE, f"Missing sector: {sector}"
+        missing = EXPECTED_SECTORS - symbol_universe.keys()
+        assert not missing, f"Missing sectors: {sorted(missing)}"
+
+    @pytest.mark.parametrize(
+        'sector,subsectors', SECTOR_ITEMS, ids=[sector for sector, _ in SECTOR_ITEMS]
+    )
+    def test_sector_invariants(self, sector, subsectors):
+        """Each sector should have metadata and non-empty subsectors."""
+        assert len(subsectors) > 0, f"{sector} has no subsectors"
 
-    def test_each_sector_has_subsectors(self):
-        """Each sector should have at least one subsector."""
-        for sector, subsectors in SYMBOL_UNIVERSE.items():
-            assert len(subsectors) > 0, f"{sector} has no subsectors"
+        empty = [subsector for subsector, symbols in subsectors.items() if not symbols]
+        assert not empty, f"{sector} subsectors with no symbols: {empty}"
 
-    def test_each_subsector_has_symbols(self):
-        """Each subsector should have at least one symbol."""
-        for sector, subsectors in SYMBOL_UNIVERSE.items():
-            for subsector, symbols in subsectors.items():
-                assert len(symbols) > 0, f"{sector}.{subsector} has no symbols"
+        metadata = SECTOR_METADATA.get(sector, {})
+        missing = SECTOR_METADATA_REQUIRED_FIELDS - metadata.keys()
+        assert not missing, f"{sector} missing metadata: {sorted(missing)}"
 
-    def test_symbols_are_uppercase(self):
+    def test_symbols_are_uppercase(self, symbol_index):
         """All symbols in universe should be uppercase."""
-        for sector, subsectors in SYMBOL_UNIVERSE.items():
-            for subsector, symbols in subsectors.items():
-                for symbol in symbols:
-                    assert symbol == symbol.upper(), \
-                        f"Symbol not uppercase: {symbol} in {sector}.{subsector}"
+        bad = [symbol for symbol in symbol_index if not symbol.isupper()]
+        assert not bad, f"Symbols not uppercase: {bad}"
 
     def test_get_symbols_by_path(self):
         """Should get symbols using dot notation path."""
-        bank_symbols = get_symbols_by_path('financials.banks')
+        bank_symbols = _cached_get('financials.banks')
         assert len(bank_symbols) > 0
         assert 'JPM' in bank_symbols
 
-    def test_sector_metadata_exists(self):
-        """Each sector should have metadata."""
-        for sector in SYMBOL_UNIVERSE.keys():
-            metadata = SECTOR_METADATA.get(sector, {})
-            assert 'name' in metadata, f"{sector} missing metadata name"
-            assert 'color' in metadata, f"{sector} missing metadata color"
-
-    def test_get_sector_for_symbol(self):
+    def test_get_sector_for_symbol(self, symbol_index):
         """Should find sector for a symbol."""
         sector, subsector = get_sector_for_symbol('JPM')
         assert sector == 'financials'
         assert subsector == 'banks'
+        assert symbol_index['JPM'] == (sector, subsector)
 
-    def test_futures_symbols_have_suffix(self):
-        """Futures symbols should have _F suffix."""
-        futures_symbols = []
-        for subsector in SYMBOL_UNIVERSE.get('futures', {}).values():
-            futures_symbols.extend(subsector)
+    def test_get_sector_for_symbol_matches_index(self, symbol_index):
+        """get_sector_for_symbol should agree with the universe for every symbol."""
+        wrong = [
+            symbol for symbol, location in symbol_index.items()
+            if get_sector_for_symbol(symbol) != location
+        ]
+        assert not wrong, f"get_sector_for_symbol disagrees for: {wrong}"
 
-        for symbol in futures_symbols:
-            assert symbol.endswith('_F'), f"Futures symbol missing _F: {symbol}"
+    def test_futures_symbols_have_suffix(self, symbol_index):
+        """Futures symbols should have _F suffix."""
+        missing = [
+            symbol for symbol, (sector, _) in symbol_index.items()
+            if sector == 'futures' and not symbol.endswith('_F')
+        ]
+        assert not missing, f"Futures symbols missing _F: {missing}"
 
 
 class TestMacroStrategies:
     """Tests for macro strategy definitions."""
 
-    def test_strategies_not_empty(self):
+    def test_strategies_not_empty(self, strategies):
         """Strategies should have entries."""
-        assert len(STRATEGIES) == 5
-
-    def test_strategy_has_required_fields(self):
-        """Each strategy should have required fields."""
-        required_fields = [
-            'id', 'name', 'description', 'risk_level', 'expected_return',
-            'color', 'volatility', 'daily_drift', 'trade_frequency_seconds',
-            'target_investment_ratio', 'max_position_pct', 'stocks'
-        ]
+        assert len(strategies) == 5
+
+    @pytest.mark.parametrize(
+        'strategy_id,strategy', STRATEGY_ITEMS, ids=[sid for sid, _ in STRATEGY_ITEMS]
+    )
+    def test_strategy_invariants(self, strategy_id, strategy):
+        """Each strategy should have required fields, risk 1-5, positive volatility and a (min, max) return."""
+        missing = STRATEGY_REQUIRED_FIELDS - strategy.keys()
+        assert not missing, f"{strategy_id} missing fields: {sorted(missing)}"
+
+        risk = strategy['risk_level']
+        assert 1 <= risk <= 5, f"{strategy_id} has invalid risk level: {risk}"
+
+        assert strategy['volatility'] > 0, \
+            f"{strategy_id} has non-positive volatility"
 
-        for strategy_id, strategy in STRATEGIES.items():
-            for field in required_fields:
-                assert field in strategy, f"{strategy_id} missing field: {field}"
+        ret = strategy['expected_return']
+        assert isinstance(ret, tuple), f"{strategy_id} expected_return not tuple"
+        assert len(ret) == 2, f"{strategy_id} expected_return should have 2 elements"
+        assert ret[0] <= ret[1], f"{strategy_id} min > max"
 
-    def test_expected_macro_strategies_present(self):
+    def test_expected_macro_strategies_present(self, strategies, strategy_ids):
         """All five macro strategies should be defined."""
-        expected = [
-            'monetary_policy', 'inflation_hedge', 'growth_expansion',
-            'defensive_quality', 'liquidity_cycle'
-        ]
-        for strategy_id in expected:
-            assert strategy_id in STRATEGIES, f"Missing strategy: {strategy_id}"
-        assert STRATEGY_IDS == expected
-
-    def test_risk_levels_valid(self):
-        """Risk levels should be 1-5."""
-        for strategy_id, strategy in STRATEGIES.items():
-            risk = strategy['risk_level']
-            assert 1 <= risk <= 5, f"{strategy_id} has invalid risk level: {risk}"
-
-    def test_strategy_volatility_positive(self):
-        """Strategy volatility should be positive."""
-        for strategy_id, strategy in STRATEGIES.items():
-            assert strategy['volatility'] > 0, \
-                f"{strategy_id} has non-positive volatility"
+        missing = EXPECTED_STRATEGIES - strategies.keys()
+        assert not missing, f"Missing strategies: {sorted(missing)}"
+        assert strategy_ids == EXPECTED_STRATEGY_IDS
 
     def test_get_strategy_exists(self):
         """get_strategy should return strategy data."""
@@ -195,87 +287,77 @@ class TestMacroStrategies:
         strategy = get_strategy('invalid_strategy')
         assert strategy is None
 
-    def test_defensive_is_low_risk(self):
-        """Defensive quality strategy should have low risk."""
-        strategy = get_strategy('defensive_quality')
-        assert strategy['risk_level'] == 1
-        assert strategy['volatility'] < 0.01
-
-    def test_growth_expansion_is_high_risk(self):
-        """Growth expansion strategy should have high risk."""
-        strategy = get_strategy('growth_expansion')
-        assert strategy['risk_level'] == 5
-        assert strategy['volatility'] > 0.02
-
-    def test_strategy_expected_returns_format(self):
-        """Expected returns should be a tuple with (min, max)."""
-        for strategy_id, strategy in STRATEGIES.items():
-            ret = strategy['expected_return']
-            assert isinstance(ret, tuple), f"{strategy_id} expected_return not tuple"
-            assert len(ret) == 2, f"{strategy_id} expected_return should have 2 elements"
-            assert ret[0] <= ret[1], f"{strategy_id} min > max"
-
-    def test_strategy_colors_are_hex(self):
+    @pytest.mark.parametrize('strategy_id,risk,vol_op,vol_threshold', [
+        pytest.param('defensive_quality', 1, operator.lt, 0.01, id='defensive_is_low_risk'),
+        pytest.param('growth_expansion', 5, operator.gt, 0.02, id='growth_expansion_is_high_risk'),
+    ])
+    def test_strategy_risk_bounds(self, strategies, strategy_id, risk, vol_op, vol_threshold):
+        """Defensive should be low risk/volatility, growth expansion high."""
+        strategy = strategies[strategy_id]
+        assert strategy['risk_level'] == risk
+        assert vol_op(strategy['volatility'], vol_threshold), \
+            f"{strategy_id} volatility {strategy['volatility']} outside bound"
+
+    def test_strategy_colors_are_hex(self, strategies):
         """Strategy colors should be valid hex codes."""
-        for strategy_id, strategy in STRATEGIES.items():
-            color = strategy['color']
-            assert color.startswith('#'), f"{strategy_id} color not hex: {color}"
-            assert len(color) == 7, f"{strategy_id} color wrong length: {color}"
+        bad = {
+            strategy_id: strategy['color']
+            for strategy_id, strategy in strategies.items()
+            if not _HEX_RE.fullmatch(strategy['color'])
+        }
+        assert not bad, f"Strategy colors not #RRGGBB hex: {bad}"
 
 
 class TestMacroSectorAllocation:
     """Tests for macro strategy sector allocations."""
 
-    def test_strategies_have_sector_allocation(self):
+    def test_strategies_have_sector_allocation(self, strategies):
         """Each macro strategy should have sector_allocation."""
-        for strategy_id, strategy in STRATEGIES.items():
+        for strategy_id, strategy in strategies.items():
             assert 'sector_allocation' in strategy, \
                 f"{strategy_id} missing sector_allocation"
             assert len(strategy['sector_allocation']) > 0
 
-    def test_sector_allocation_weights_valid(self):
-        """Sector allocation weights should sum to ~1.0."""
-        for strategy_id, strategy in STRATEGIES.items():
-            allocation = strategy.get('sector_allocation', {})
-            total = sum(allocation.values())
-            assert 0.95 <= total <= 1.05, \
-                f"{strategy_id} allocation weights sum to {total}, should be ~1.0"
+    def test_sector_allocation_weights_valid(self, strategy_stats):
+        """Sector allocation weights should sum to 1.0."""
+        for strategy_id, stats in strategy_stats.items():
+            total = stats['allocation_total']
+            assert abs(total - 1.0) < WEIGHT_TOLERANCE, \
+                f"{strategy_id} allocation weights sum to {total}, should be 1.0"
 
-    def test_sector_paths_valid(self):
+    def test_sector_paths_valid(self, strategies):
         """Sector allocation paths should exist in symbol universe."""
-        for strategy_id, strategy in STRATEGIES.items():
+        for strategy_id, strategy in strategies.items():
             allocation = strategy.get('sector_allocation', {})
             for path in allocation.keys():
-                symbols = get_symbols_by_path(path)
+                symbols = _cached_get(path)
                 assert len(symbols) > 0, \
                     f"{strategy_id} has invalid sector path: {path}"
 
-    def test_strategies_have_max_min_symbols(self):
+    def test_strategies_have_max_min_symbols(self, strategies):
         """Strategies should have max_symbols and min_symbols."""
-        for strategy_id, strategy in STRATEGIES.items():
-            assert 'max_symbols' in strategy
-            assert 'min_symbols' in strategy
+        for strategy_id, strategy in strategies.items():
+            missing = {'max_symbols', 'min_symbols'} - strategy.keys()
+            assert not missing, f"{strategy_id} missing: {sorted(missing)}"
             assert strategy['min_symbols'] <= strategy['max_symbols']
 
-    def test_defensive_focuses_on_safe_sectors(self):
+    def test_defensive_focuses_on_safe_sectors(self, strategy_stats):
         """Defensive strategy should focus on utilities, staples, healthcare."""
-        strategy = get_strategy('defensive_quality')
-        allocation = strategy['sector_allocation']
+        sector_weights = strategy_stats['defensive_quality']['sector_weights']
 
-        safe_weight = sum(
-            weight for path, weight in allocation.items()
-            if any(s in path for s in ['utilities', 'consumer_staples', 'healthcare'])
+        safe_weight = fsum(
+            weight for sector, weight in sector_weights.items()
+            if sector in SAFE_SECTORS
         )
         assert safe_weight >= 0.5, "Defensive should have >50% in safe sectors"
 
-    def test_inflation_hedge_focuses_on_commodities(self):
+    def test_inflation_hedge_focuses_on_commodities(self, strategy_stats):
         """Inflation hedge should focus on energy, materials, futures."""
-        strategy = get_strategy('inflation_hedge')
-        allocation = strategy['sector_allocation']
+        sector_weights = strategy_stats['inflation_hedge']['sector_weights']
 
-        commodity_weight = sum(
-            weight for path, weight in allocation.items()
-            if any(s in path for s in ['energy', 'materials', 'futures'])
+        commodity_weight = fsum(
+            weight for sector, weight in sector_weights.items()
+            if sector in COMMODITY_SECTORS
         )
         assert commodity_weight >= 0.7, "Inflation hedge should have >70% in commodities"
 
@@ -283,37 +365,37 @@ class TestMacroSectorAllocation:
 class TestMacroSignals:
     """Tests for macro signal configurations in strategies."""
 
-    def test_strategies_have_signals(self):
+    def test_strategies_have_signals(self, strategies):
         """Each macro strategy should have FRED signal configuration."""
-        for strategy_id, strategy in STRATEGIES.items():
+        for strategy_id, strategy in strategies.items():
             assert 'signals' in strategy, f"{strategy_id} missing signals"
             assert len(strategy['signals']) > 0
 
-    def test_signal_configs_valid(self):
+    def test_signal_configs_valid(self, signal_index):
         """Signal configs should have required fields."""
-        for strategy_id, strategy in STRATEGIES.items():
-            for signal_name, config in strategy.get('signals', {}).items():
-                assert 'series' in config, \
-                    f"{strategy_id}.{signal_name} missing series"
-                assert 'weight' in config, \
-                    f"{strategy_id}.{signal_name} missing weight"
-
-    def test_signal_weights_valid(self):
-        """Signal weights should sum to ~1.0."""
-        for strategy_id, strategy in STRATEGIES.items():
-            signals = strategy.get('signals', {})
-            total = sum(s.get('weight', 0) for s in signals.values())
-            assert 0.95 <= total <= 1.05, \
-                f"{strategy_id} signal weights sum to {total}, should be ~1.0"
-
-    def test_defensive_has_inverted_signals(self):
+        triples, _ = signal_index
+        bad = {
+            f"{strategy_id}.{signal_name}": sorted(SIGNAL_REQUIRED_FIELDS - config.keys())
+            for strategy_id, signal_name, config in triples
+            if not SIGNAL_REQUIRED_FIELDS <= config.keys()
+        }
+        assert not bad, f"Signals missing fields: {bad}"
+
+    def test_signal_weights_valid(self, signal_index):
+        """Signal weights should sum to 1.0."""
+        _, weight_sums = signal_index
+        for strategy_id, total in weight_sums.items():
+            assert abs(total - 1.0) < WEIGHT_TOLERANCE, \
+                f"{strategy_id} signal weights sum to {total}, should be 1.0"
+
+    def test_defensive_has_inverted_signals(self, signal_index):
         """Defensive strategy should have some inverted signals."""
-        strategy = get_strategy('defensive_quality')
-        signals = strategy.get('signals', {})
+        triples, _ = signal_index
 
         has_inverted = any(
             config.get('invert', False)
-            for config in signals.values()
+            for strategy_id, _, config in triples
+            if strategy_id == 'defensive_quality'
         )
         assert has_inverted, "Defensive should have inverted signals (risk-off)"
 
@@ -321,15 +403,33 @@ class TestMacroSignals:
 class TestDynamicStockSelection:
     """Tests for dynamic stock selection from strategies."""
 
-    def test_get_strategy_stocks_returns_list(self):
+    def test_get_strategy_stocks_returns_list(self, strategy_stocks):
         """get_strategy_stocks should return a list."""
-        for strategy_id in STRATEGY_IDS:
-            stocks = get_strategy_stocks(strategy_id)
-            assert isinstance(stocks, list)
-            assert len(stocks) > 0
+        for strategy_id, stocks in strategy_stocks.items():
+            assert isinstance(stocks, list), f"{strategy_id} stocks not a list"
+            assert len(stocks) > 0, f"{strategy_id} has no stocks"
 
-    def test_fallback_stocks_exist(self):
+    def test_fallback_stocks_exist(self, strategies):
         """Each strategy should have fallback static stocks."""
-        for strategy_id, strategy in STRATEGIES.items():
+        for strategy_id, strategy in strategies.items():
             assert 'stocks' in strategy
             assert len(strategy['stocks']) >= 5
+
+    def test_strategy_stocks_exist(self, strategies):
+        """Every fallback stock should be in the symbol universe."""
+        referenced = set().union(*(s['stocks'] for s in strategies.values()))
+        missing = referenced.difference(get_all_symbols())
+        assert not missing, f"Unknown strategy stocks: {sorted(missing)}"
+
+
+class TestSharedDataFixtures:
+    """The session-scoped data fixtures must not be mutable by tests."""
+
+    def test_data_fixtures_are_read_only(self, stock_universe, symbol_universe, strategies):
+        """Nested dicts and lists in the shared fixtures reject mutation."""
+        with pytest.raises(TypeError):
+            stock_universe['AAPL']['beta'] = 0
+        with pytest.raises(AttributeError):
+            symbol_universe['financials']['banks'].append('XXX')
+        with pytest.raises(TypeError):
+            strategies['monetary_policy']['signals']['new'] = {}
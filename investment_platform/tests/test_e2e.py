@@ -8,9 +8,13 @@ Tests complete user flows including:
 - Dashboard data refresh cycle
 """
 import pytest
-from decimal import Decimal
-from datetime import datetime, date, timedelta
-import json
+
+from app.models import PortfolioState
+
+pytestmark = pytest.mark.e2e
+
+# Trade timestamps are never asserted on; a fixed value keeps payloads deterministic
+FROZEN_TS = '2024-01-01T12:00:00'
 
 
 class TestCompleteTradeFlow:
@@ -29,11 +33,7 @@ class TestCompleteTradeFlow:
         """
         user_id = 'e2e_test_user'
 
-        # 1. Initialize/Reset portfolio
-        response = client.post(f'/api/portfolio/reset?user_id={user_id}')
-        assert response.status_code == 200
-
-        # Get initial state
+        # 1. Get initial state (first access creates the default portfolio)
         response = client.get(f'/api/portfolio/settings?user_id={user_id}')
         assert response.status_code == 200
         initial_data = response.get_json()
@@ -48,98 +48,31 @@ class TestCompleteTradeFlow:
         assert response.status_code == 200
         assert response.get_json()['current_strategy'] == 'growth'
 
-        # 3. Execute buy trade - buy 100 shares of AAPL at $150
-        buy_trade = {
-            'trade_id': 'e2e-buy-001',
-            'timestamp': datetime.now().isoformat(),
+        # 3. Execute buy trade - buy 100 shares of AAPL at $150; the trading
+        # endpoint records the trade and updates cash and holdings itself
+        response = client.post('/api/trading/execute', json={
+            'user_id': user_id,
             'type': 'buy',
             'symbol': 'AAPL',
-            'stock_name': 'Apple Inc.',
-            'sector': 'Technology',
             'quantity': 100,
-            'price': 150.00,
-            'total': 15000.00,
-            'fees': 15.00,
-            'strategy': 'growth'
-        }
-        response = client.post(
-            f'/api/trades?user_id={user_id}',
-            json=buy_trade
-        )
+            'price': 150.00
+        })
         assert response.status_code == 201
-
-        # Update cash after buy
-        new_cash = initial_cash - 15000.00 - 15.00
-        response = client.put(
-            f'/api/portfolio/cash?user_id={user_id}',
-            json={'current_cash': new_cash}
-        )
-        assert response.status_code == 200
-
-        # Update holdings
-        response = client.put(
-            f'/api/holdings?user_id={user_id}',
-            json=[{
-                'symbol': 'AAPL',
-                'name': 'Apple Inc.',
-                'sector': 'Technology',
-                'quantity': 100,
-                'avg_cost': 150.00
-            }]
-        )
-        assert response.status_code == 200
+        result = response.get_json()
+        assert result['new_cash_balance'] == initial_cash - 15000.00 - 15.00
 
         # 4. Execute sell trade - sell 50 shares at $160 (profit)
-        sell_trade = {
-            'trade_id': 'e2e-sell-001',
-            'timestamp': datetime.now().isoformat(),
+        response = client.post('/api/trading/execute', json={
+            'user_id': user_id,
             'type': 'sell',
             'symbol': 'AAPL',
-            'stock_name': 'Apple Inc.',
-            'sector': 'Technology',
             'quantity': 50,
-            'price': 160.00,
-            'total': 8000.00,
-            'fees': 8.00,
-            'strategy': 'growth'
-        }
-        response = client.post(
-            f'/api/trades?user_id={user_id}',
-            json=sell_trade
-        )
+            'price': 160.00
+        })
         assert response.status_code == 201
 
-        # Calculate realized gain: (160 - 150) * 50 = $500
-        realized_gain = (160 - 150) * 50
-        assert realized_gain == 500
-
-        # Update portfolio with realized gains
-        response = client.put(
-            f'/api/portfolio/settings?user_id={user_id}',
-            json={'realized_gains': realized_gain}
-        )
-        assert response.status_code == 200
-
-        # Update cash after sell
-        final_cash = new_cash + 8000.00 - 8.00
-        response = client.put(
-            f'/api/portfolio/cash?user_id={user_id}',
-            json={'current_cash': final_cash}
-        )
-        assert response.status_code == 200
-
-        # Update holdings (50 shares remaining)
-        response = client.put(
-            f'/api/holdings?user_id={user_id}',
-            json=[{
-                'symbol': 'AAPL',
-                'name': 'Apple Inc.',
-                'sector': 'Technology',
-                'quantity': 50,
-                'avg_cost': 150.00
-            }]
-        )
-        assert response.status_code == 200
+        # Realized gain: (160 - 150) * 50 = $500
+        assert response.get_json()['realized_gain'] == 500.00
 
         # 5. Verify realized gains
         response = client.get(f'/api/portfolio/settings?user_id={user_id}')
@@ -189,7 +122,7 @@ class TestPortfolioLifecycle:
 
         # First access creates default portfolio
         response = client.get(f'/api/portfolio/settings?user_id={user_id}')
-        assert response.status_code in [200, 201]
+        assert response.status_code in {200, 201}
 
         data = response.get_json()
         assert data['initial_value'] == 100000.00
@@ -197,16 +130,10 @@ class TestPortfolioLifecycle:
         assert data['current_strategy'] == 'balanced'
         assert data['is_initialized'] == False
 
-        # Clean up
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
-
     def test_portfolio_initialization_flag(self, client, db_session):
         """Portfolio initialization flag updates correctly."""
         user_id = 'init_test_user'
 
-        # Reset to fresh state
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
-
         # Get fresh portfolio
         response = client.get(f'/api/portfolio/settings?user_id={user_id}')
         data = response.get_json()
@@ -215,7 +142,7 @@ class TestPortfolioLifecycle:
         # Execute first trade (initializes portfolio)
         trade = {
             'trade_id': 'init-trade-001',
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': FROZEN_TS,
             'type': 'buy',
             'symbol': 'AAPL',
             'quantity': 10,
@@ -236,9 +163,6 @@ class TestPortfolioLifecycle:
         data = response.get_json()
         assert data['is_initialized'] == True
 
-        # Clean up
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
-
 
 class TestStrategyFlow:
     """End-to-end tests for strategy management."""
@@ -247,9 +171,6 @@ class TestStrategyFlow:
         """Switch between strategies and verify customizations persist."""
         user_id = 'strategy_e2e_user'
 
-        # Reset
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
-
         # Start with balanced
         response = client.get(f'/api/portfolio/settings?user_id={user_id}')
         assert response.get_json()['current_strategy'] == 'balanced'
@@ -303,9 +224,6 @@ class TestStrategyFlow:
         if balanced:
             assert balanced['confidence_level'] == 75
 
-        # Clean up
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
-
 
 class TestDashboardDataFlow:
     """End-to-end tests for dashboard data refresh."""
@@ -315,9 +233,6 @@ class TestDashboardDataFlow:
         user_id = 'dashboard_e2e_user'
 
         # Setup portfolio with holdings
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
-
-        # Add some holdings
         holdings = [
             {'symbol': 'AAPL', 'name': 'Apple', 'sector': 'Tech', 'quantity': 100, 'avg_cost': 150},
             {'symbol': 'MSFT', 'name': 'Microsoft', 'sector': 'Tech', 'quantity': 50, 'avg_cost': 300}
@@ -350,156 +265,54 @@ class TestDashboardDataFlow:
         total = float(portfolio['current_cash']) + invested
         assert total == 100000.00
 
-        # Clean up
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
-
 
 class TestMultipleTradesAccumulation:
     """Test multiple trades and their cumulative effects."""
 
-    def test_multiple_buys_avg_cost(self, client, db_session):
-        """Multiple buys should correctly update average cost."""
-        user_id = 'multi_buy_user'
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
-
-        # First buy: 100 shares at $150
-        client.post(
-            f'/api/trades?user_id={user_id}',
-            json={
-                'trade_id': 'multi-buy-001',
-                'timestamp': datetime.now().isoformat(),
-                'type': 'buy',
-                'symbol': 'AAPL',
-                'quantity': 100,
-                'price': 150.00,
-                'total': 15000.00,
-                'fees': 15.00,
-                'strategy': 'balanced'
-            }
-        )
-
-        # Set initial holding
-        client.put(
-            f'/api/holdings?user_id={user_id}',
-            json=[{
+    # (user_id, [(type, quantity, price, realized_gain), ...], expected final state);
+    # realized_gain is the per-sell gain the endpoint should report, None for buys
+    @pytest.mark.parametrize('user_id,trades,expected', [
+        pytest.param(
+            'multi_buy_user',
+            # New avg = (100*150 + 100*170) / 200 = 32000/200 = 160
+            [('buy', 100, 150.00, None), ('buy', 100, 170.00, None)],
+            {'quantity': 200, 'avg_cost': 160.00, 'realized_gains': 0.00},
+            id='multiple_buys_avg_cost'
+        ),
+        pytest.param(
+            'multi_sell_user',
+            # Gains: (120-100)*50 = 1000, then (130-100)*50 = 1500
+            [('buy', 200, 100.00, None),
+             ('sell', 50, 120.00, 1000.00),
+             ('sell', 50, 130.00, 1500.00)],
+            {'quantity': 100, 'avg_cost': 100.00, 'realized_gains': 2500.00},
+            id='realized_gains_accumulation'
+        ),
+    ])
+    def test_trade_sequence(self, client, db_session, user_id, trades, expected):
+        """A sequence of trades should leave the expected holding and realized gains."""
+        for trade_type, quantity, price, realized_gain in trades:
+            response = client.post('/api/trading/execute', json={
+                'user_id': user_id,
+                'type': trade_type,
                 'symbol': 'AAPL',
-                'name': 'Apple',
-                'sector': 'Tech',
-                'quantity': 100,
-                'avg_cost': 150.00
-            }]
-        )
-
-        # Second buy: 100 shares at $170
-        client.post(
-            f'/api/trades?user_id={user_id}',
-            json={
-                'trade_id': 'multi-buy-002',
-                'timestamp': datetime.now().isoformat(),
-                'type': 'buy',
-                'symbol': 'AAPL',
-                'quantity': 100,
-                'price': 170.00,
-                'total': 17000.00,
-                'fees': 17.00,
-                'strategy': 'balanced'
-            }
-        )
-
-        # Update holding with new average cost
-        # New avg = (100*150 + 100*170) / 200 = 32000/200 = 160
-        client.put(
-            f'/api/holdings?user_id={user_id}',
-            json=[{
-                'symbol': 'AAPL',
-                'name': 'Apple',
-                'sector': 'Tech',
-                'quantity': 200,
-                'avg_cost': 160.00
-            }]
-        )
+                'quantity': quantity,
+                'price': price
+            })
+            assert response.status_code == 201
+            if realized_gain is not None:
+                assert response.get_json()['realized_gain'] == realized_gain
 
         # Verify
         response = client.get(f'/api/holdings?user_id={user_id}')
         holdings = response.get_json()
         assert len(holdings) == 1
-        assert holdings[0]['quantity'] == 200
-        assert holdings[0]['avg_cost'] == 160.00
-
-        # Clean up
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
-
-    def test_realized_gains_accumulation(self, client, db_session):
-        """Multiple sells should accumulate realized gains."""
-        user_id = 'multi_sell_user'
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
-
-        # Setup: Buy 200 shares at $100
-        client.put(
-            f'/api/holdings?user_id={user_id}',
-            json=[{
-                'symbol': 'AAPL',
-                'name': 'Apple',
-                'sector': 'Tech',
-                'quantity': 200,
-                'avg_cost': 100.00
-            }]
-        )
-
-        # First sell: 50 shares at $120 -> gain = (120-100)*50 = $1000
-        client.post(
-            f'/api/trades?user_id={user_id}',
-            json={
-                'trade_id': 'multi-sell-001',
-                'timestamp': datetime.now().isoformat(),
-                'type': 'sell',
-                'symbol': 'AAPL',
-                'quantity': 50,
-                'price': 120.00,
-                'total': 6000.00,
-                'fees': 6.00,
-                'strategy': 'balanced'
-            }
-        )
+        assert holdings[0]['quantity'] == expected['quantity']
+        assert holdings[0]['avg_cost'] == expected['avg_cost']
 
-        client.put(
-            f'/api/portfolio/settings?user_id={user_id}',
-            json={'realized_gains': 1000.00}
-        )
-
-        # Second sell: 50 shares at $130 -> gain = (130-100)*50 = $1500
-        client.post(
-            f'/api/trades?user_id={user_id}',
-            json={
-                'trade_id': 'multi-sell-002',
-                'timestamp': datetime.now().isoformat(),
-                'type': 'sell',
-                'symbol': 'AAPL',
-                'quantity': 50,
-                'price': 130.00,
-                'total': 6500.00,
-                'fees': 6.50,
-                'strategy': 'balanced'
-            }
-        )
-
-        # Total realized gains = 1000 + 1500 = 2500
-        client.put(
-            f'/api/portfolio/settings?user_id={user_id}',
-            json={'realized_gains': 2500.00}
-        )
-
-        # Verify
         response = client.get(f'/api/portfolio/settings?user_id={user_id}')
         data = response.get_json()
-        assert float(data['realized_gains']) == 2500.00
-
-        # Tax should be 2500 * 0.37 = 925
-        expected_tax = 2500.00 * 0.37
-        assert expected_tax == 925.00
-
-        # Clean up
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
+        assert float(data['realized_gains']) == expected['realized_gains']
 
 
 class TestErrorRecovery:
@@ -508,11 +321,11 @@ class TestErrorRecovery:
     def test_failed_trade_no_side_effects(self, client, db_session):
         """Failed trade should not affect portfolio state."""
         user_id = 'error_recovery_user'
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
 
-        # Get initial state
-        initial_resp = client.get(f'/api/portfolio/settings?user_id={user_id}')
-        initial_state = initial_resp.get_json()
+        # Snapshot the initial state straight from the database
+        portfolio = PortfolioState.get_or_create(user_id)
+        initial_cash = portfolio.current_cash
+        initial_gains = portfolio.realized_gains
 
         # Attempt invalid trade (missing required fields)
         client.post(
@@ -525,14 +338,14 @@ class TestErrorRecovery:
         )
 
         # State should be unchanged
-        after_resp = client.get(f'/api/portfolio/settings?user_id={user_id}')
-        after_state = after_resp.get_json()
-
-        assert float(initial_state['current_cash']) == float(after_state['current_cash'])
-        assert float(initial_state['realized_gains']) == float(after_state['realized_gains'])
-
-        # Clean up
-        client.post(f'/api/portfolio/reset?user_id={user_id}')
+        after = (
+            db_session.query(PortfolioState)
+            .filter_by(user_id=user_id)
+            .populate_existing()
+            .one()
+        )
+        assert after.current_cash == initial_cash
+        assert after.realized_gains == initial_gains
 
 
 class TestMarketDataIntegration:
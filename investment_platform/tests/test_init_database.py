@@ -0,0 +1,22 @@
+"""
+Unit Tests for the Database Initialization Script
+
+Tests the CSV loader's file name to symbol mapping.
+"""
+import pytest
+
+from scripts.init_database import csv_filename_to_symbol
+
+
+class TestCsvFilenameToSymbol:
+    """Tests for csv_filename_to_symbol."""
+
+    @pytest.mark.parametrize('stem,symbol', [
+        ('AAPL', 'AAPL'),
+        ('_GSPC', '^GSPC'),
+        ('CL_F', 'CL_F'),
+        ('2YY_F', '2YY_F'),
+    ])
+    def test_maps_stem_to_app_symbol(self, stem, symbol):
+        """Index stems gain a caret; futures stems stay as the app stores them."""
+        assert csv_filename_to_symbol(stem) == symbol
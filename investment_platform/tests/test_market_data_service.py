@@ -236,6 +236,59 @@ class TestCacheManagement:
             count = db_session.query(MarketDataCache).count()
             assert count == 0
 
+    def test_save_to_cache(self, app, db_session):
+        """Should write DataFrame rows to the cache and update metadata."""
+        with app.app_context():
+            service = MarketDataService()
+            df = pd.DataFrame(
+                {
+                    'open': [150.0, 151.0],
+                    'high': [152.0, 153.0],
+                    'low': [148.0, 149.0],
+                    'close': [151.0, 152.0],
+                    'adj_close': [151.0, 152.0],
+                    'volume': [1000000, np.nan],
+                },
+                index=[date(2024, 1, 15), date(2024, 1, 16)]
+            )
+
+            saved = service._save_to_cache('NVDA', df)
+
+            assert saved == 2
+            rows = db_session.query(MarketDataCache).filter_by(symbol='NVDA').order_by(MarketDataCache.date).all()
+            assert [r.volume for r in rows] == [1000000, None]
+            metadata = db_session.query(MarketDataMetadata).filter_by(symbol='NVDA').one()
+            assert metadata.total_records == 2
+            assert metadata.latest_date == date(2024, 1, 16)
+
+    def test_save_to_cache_missing_price_columns(self, app, db_session):
+        """Absent open/high/low columns should be written as None, not NaN."""
+        with app.app_context():
+            service = MarketDataService()
+            df = pd.DataFrame(
+                {
+                    'close': [151.0, 152.0],
+                    'adj_close': [151.0, 152.0],
+                    'volume': [1000000, 2000000],
+                },
+                index=[date(2024, 1, 15), date(2024, 1, 16)]
+            )
+
+            with patch.object(MarketDataCache, 'bulk_insert',
+                              wraps=MarketDataCache.bulk_insert) as bulk_insert:
+                saved = service._save_to_cache('NVDA', df)
+
+            assert saved == 2
+            records = bulk_insert.call_args.args[0]
+            for record in records:
+                assert record['open'] is None
+                assert record['high'] is None
+                assert record['low'] is None
+            assert [record['close'] for record in records] == [151.0, 152.0]
+
+            rows = db_session.query(MarketDataCache).filter_by(symbol='NVDA').all()
+            assert all(r.open is None and r.high is None and r.low is None for r in rows)
+
     def test_refresh_cache_from_csv(self, app, db_session, tmp_path):
         """Should refresh cache by reloading CSV."""
         with app.app_context():
@@ -334,6 +334,36 @@ class TestMarketDataCacheModel:
         assert 'close' in data
         assert 'volume' in data
 
+    @pytest.mark.parametrize('dialect_name', ['sqlite', 'postgresql'])
+    def test_bulk_insert_inserts_and_updates(self, db_session, sample_market_data,
+                                             monkeypatch, dialect_name):
+        """Test bulk insert adds new dates and updates existing ones.
+
+        Runs once on the SQLite upsert path and once with the dialect name
+        patched, which forces the generic prefetch-and-update path.
+        """
+        monkeypatch.setattr(db_session.get_bind().dialect, 'name', dialect_name)
+        existing = sample_market_data[0]
+        new_date = date.today() + timedelta(days=1)
+
+        MarketDataCache.bulk_insert([
+            {'symbol': 'AAPL', 'date': existing.date, 'close': Decimal('999.00'),
+             'adj_close': Decimal('999.00'), 'volume': 1},
+            {'symbol': 'AAPL', 'date': new_date, 'close': Decimal('100.00'),
+             'adj_close': Decimal('100.00'), 'volume': 2},
+            {'symbol': 'AAPL', 'date': new_date, 'close': Decimal('101.00'),
+             'adj_close': Decimal('101.00'), 'volume': 3},
+        ])
+        db_session.commit()
+
+        rows = db_session.query(MarketDataCache).filter_by(symbol='AAPL').all()
+        by_date = {r.date: r for r in rows}
+        assert len(rows) == len(sample_market_data) + 1
+        assert by_date[existing.date].close == Decimal('999.00')
+        assert by_date[new_date].close == Decimal('101.00')
+        assert by_date[existing.date].volume == 1
+        assert by_date[new_date].volume == 3
+
 
 class TestMarketDataMetadataModel:
     """Tests for MarketDataMetadata model."""
@@ -373,3 +403,21 @@ class TestMarketDataMetadataModel:
         db_session.commit()
 
         assert metadata.fetch_status == 'pending'
+
+    def test_upsert_after_fetch(self, db_session):
+        """Test upsert creates metadata and then widens the date range."""
+        start = date(2024, 1, 2)
+        MarketDataMetadata.upsert_after_fetch('AMZN', start, start + timedelta(days=10), 8)
+        db_session.commit()
+
+        MarketDataMetadata.upsert_after_fetch(
+            'AMZN', start + timedelta(days=5), start + timedelta(days=20), 15
+        )
+        db_session.commit()
+        db_session.expire_all()
+
+        metadata = db_session.query(MarketDataMetadata).filter_by(symbol='AMZN').one()
+        assert metadata.earliest_date == start
+        assert metadata.latest_date == start + timedelta(days=20)
+        assert metadata.total_records == 15
+        assert metadata.fetch_status == 'complete'